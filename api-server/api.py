@@ -10,15 +10,54 @@ Issue Manager API Server
 - /issues/api/* : API 端点
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import functools
+import hashlib
 import json
+import mimetypes
+import os
+import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
 
-app = FastAPI(title="Issue Manager API", version="1.0.0")
+# 共享模块位于 scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import cold_storage
+import json_codec
+from issue_store import IssueStore, file_version
+from compression import CompressionMiddleware, choose_encoding, compress, supported_encodings, weak_etag
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, Registry
+from snapshot import SnapshotReader, read_generation, section_etag, write_snapshot
+from usage_ingest import GRANULARITIES, UsageIngester, parse_timestamp
+
+
+class FastJSONResponse(JSONResponse):
+    """通过 json_codec 序列化（orjson/msgspec 可用时使用，否则标准库）"""
+
+    def render(self, content) -> bytes:
+        return json_codec.dumps_bytes(content)
+
+
+app = FastAPI(title="Issue Manager API", version="1.0.0", default_response_class=FastJSONResponse)
+
+# 小于该字节数的响应不压缩
+COMPRESSION_MIN_SIZE = 1024
+
+# 响应压缩（br / gzip）
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
 # CORS 配置 - 允许所有来源
 app.add_middleware(
@@ -29,21 +68,235 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ========================================
+# 指标 (/metrics)
+# ========================================
+
+metrics = Registry()
+REQUESTS = metrics.counter("issue_api_requests_total", "HTTP requests by route template", ("route", "method", "status"))
+REQUEST_LATENCY = metrics.histogram("issue_api_request_duration_seconds", "HTTP request latency", ("route", "method"))
+OPEN_STREAMS = metrics.gauge("issue_api_open_streams", "Open text/event-stream connections", ("route",))
+STORE_CACHE = metrics.counter("issue_store_cache_requests_total", "issue_store cache lookups", ("source", "result"))
+STORE_BYTES = metrics.counter("issue_store_bytes_read_total", "Bytes read from .issues/ by issue_store", ("source",))
+STORE_LOAD = metrics.histogram("issue_store_load_seconds", "Time to read and parse .issues/ files", ("source",))
+ASSET_CACHE = metrics.counter("asset_cache_requests_total", "Static asset cache lookups", ("result",))
+INGEST_LAG = metrics.gauge("usage_ingest_lag_seconds", "Seconds since the last completed transcript scan")
+INGEST_SCAN = metrics.gauge("usage_ingest_last_scan_seconds", "Duration of the last transcript scan")
+INGEST_BYTES = metrics.gauge("usage_ingest_bytes_read", "Transcript bytes ingested by this process")
+INGEST_GENERATION = metrics.gauge("usage_ingest_generation", "Usage aggregate generation")
+
+# 最外层：耗时包含压缩和 CORS 处理
+app.add_middleware(MetricsMiddleware, requests=REQUESTS, latency=REQUEST_LATENCY, streams=OPEN_STREAMS)
+
+
+def observe_store(event: str, source: str, value: float):
+    """issue_store 的统计回调"""
+    if event in ("hit", "miss"):
+        STORE_CACHE.inc(source=source, result=event)
+    elif event == "bytes":
+        STORE_BYTES.inc(value, source=source)
+    elif event == "load":
+        STORE_LOAD.observe(value, source=source)
+
 # Issue 数据目录
 ISSUES_DIR = Path.home() / ".openclaw/shared/async-issue-manager/.issues"
 INDEX_FILE = ISSUES_DIR / "index.json"
 PROGRESS_FILE = ISSUES_DIR / "progress.jsonl"
 DELIVERABLES_FILE = ISSUES_DIR / "deliverables/index.json"
+DELIVERABLES_DIR = ISSUES_DIR / "deliverables"
 
 # 前端页面目录
 WEB_DIR = Path.home() / ".openclaw/shared/async-issue-manager/web-dashboard"
 
 
+# 共享的缓存数据访问层（scripts/issue_store.py）
+store = IssueStore(ISSUES_DIR, observer=observe_store)
+
+# 多 worker 模式：由加载进程发布共享快照（见文件末尾 SnapshotLoader），
+# worker 设置 ISSUE_API_SNAPSHOT 后直接映射快照，不再各自解析 index / 进度日志 / transcript
+SNAPSHOT_FILE = Path.home() / ".openclaw/shared/async-issue-manager/.cache/api_snapshot.bin"
+snapshot_reader = SnapshotReader(os.environ["ISSUE_API_SNAPSHOT"]) if os.environ.get("ISSUE_API_SNAPSHOT") else None
+
+
+def current_snapshot():
+    """多 worker 模式下的当前快照；单进程模式或快照尚未发布时为 None"""
+    return snapshot_reader.current() if snapshot_reader is not None else None
+
+
+def snapshot_response(request: Request, snapshot, name: str):
+    """直接返回快照中预先序列化好的响应体"""
+    validators = make_validators(f"snapshot:{name}", snapshot.etag(name), snapshot.created_at)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+    return Response(content=bytes(snapshot.section(name)), media_type="application/json", headers=validators)
+
+
 def load_index():
-    """加载 index.json"""
-    if not INDEX_FILE.exists():
-        return {"issues": [], "next_id": 1}
-    return json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+    """加载 index.json（缓存，文件变化后重新加载；返回值勿修改）"""
+    return store.index()
+
+
+# ========================================
+# 线程池
+# ========================================
+
+# 阻塞的文件读取和 CPU 密集的解析/聚合分别使用独立的有界线程池，
+# 慢接口（/usage）最多占满自己的池子，不会拖住 /issues 等快接口
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="issue-io")
+CPU_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="issue-cpu")
+
+
+async def run_io(fn, *args, **kwargs):
+    """在 I/O 线程池中执行阻塞的文件读取"""
+    return await asyncio.get_running_loop().run_in_executor(IO_EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """在 CPU 线程池中执行解析、聚合等计算"""
+    return await asyncio.get_running_loop().run_in_executor(CPU_EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+
+# ========================================
+# 条件请求（ETag / Last-Modified）
+# ========================================
+
+def file_versions(*paths: Path):
+    """返回每个文件的 (路径, inode, 大小, mtime) 以及最新的 mtime"""
+    versions = []
+    latest = 0
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            versions.append((str(path), 0, 0, 0))
+            continue
+        versions.append((str(path), st.st_ino, st.st_size, st.st_mtime_ns))
+        latest = max(latest, st.st_mtime)
+    return versions, latest
+
+
+def make_validators(tag: str, version, last_modified: float) -> dict:
+    digest = hashlib.sha1(repr((tag, version)).encode("utf-8")).hexdigest()[:20]
+    return {
+        "ETag": f'"{digest}"',
+        "Last-Modified": formatdate(int(last_modified), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def cache_validators(tag: str, *paths: Path) -> dict:
+    """根据底层文件版本（inode、大小、mtime）生成强 ETag 和 Last-Modified
+
+    tag 用于区分同一组文件派生出的不同响应（例如 issues / stats / agents）
+    """
+    versions, latest = file_versions(*paths)
+    return make_validators(tag, versions, latest)
+
+
+def version_validators(tag: str, generation: int, updated_at: float, *paths: Path) -> dict:
+    """由内存中的数据代数（再加上可选的文件）生成 ETag，用于预聚合的数据"""
+    versions, latest = file_versions(*paths)
+    return make_validators(tag, (generation, versions), max(latest, updated_at))
+
+
+def not_modified(request: Request, validators: dict):
+    """客户端缓存仍然有效时返回 304，否则返回 None
+
+    优先比较 If-None-Match，只有没有它时才看 If-Modified-Since
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 使用弱比较：压缩后的响应带的是 W/ 前缀的 ETag
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        if "*" in tags or validators["ETag"].removeprefix("W/") in tags:
+            return Response(status_code=304, headers=validators)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            last_modified = parsedate_to_datetime(validators["Last-Modified"])
+        except (TypeError, ValueError):
+            return None
+        if last_modified <= since:
+            return Response(status_code=304, headers=validators)
+    return None
+
+
+# ========================================
+# 静态资源缓存（内存 + 预压缩）
+# ========================================
+
+# 按文件类型的 Content-Type 和 Cache-Control
+ASSET_TYPES = {
+    ".html": ("text/html; charset=utf-8", "no-cache"),
+    ".json": ("application/json", "public, max-age=30, must-revalidate"),
+}
+
+
+class StaticAssetCache:
+    """HTML / data.json 缓存在内存中，每个文件版本只读取和压缩一次"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, transform=None):
+        """返回缓存条目；文件不存在时返回 None"""
+        versions, latest = file_versions(path)
+        if versions[0][1:] == (0, 0, 0):
+            return None
+        entry = self._entries.get(path)
+        if entry is not None and entry["version"] == versions:
+            ASSET_CACHE.inc(result="hit")
+            return entry
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["version"] != versions:
+                entry = self._build(path, versions, latest, transform)
+                self._entries[path] = entry
+                ASSET_CACHE.inc(result="miss")
+            else:
+                ASSET_CACHE.inc(result="hit")
+        return entry
+
+    @staticmethod
+    def _build(path: Path, versions, latest: float, transform) -> dict:
+        data = path.read_bytes()
+        if transform:
+            data = transform(data)
+        media_type, cache_control = ASSET_TYPES.get(path.suffix, ("application/octet-stream", "no-cache"))
+        validators = make_validators(f"asset:{path}", versions, latest)
+        validators["Cache-Control"] = cache_control
+        bodies = {None: data}
+        if len(data) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                bodies[encoding] = compress(data, encoding, static=True)
+        return {"version": versions, "media_type": media_type, "validators": validators, "bodies": bodies}
+
+
+asset_cache = StaticAssetCache()
+
+
+async def serve_asset(request: Request, path: Path, transform=None):
+    """从缓存返回静态资源（支持 304 和预压缩编码），文件不存在时返回 None"""
+    entry = await run_io(asset_cache.get, path, transform)
+    if entry is None:
+        return None
+    cached = not_modified(request, entry["validators"])
+    if cached:
+        return cached
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), [e for e in entry["bodies"] if e])
+    headers = dict(entry["validators"])
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = weak_etag(headers["ETag"])
+    if len(entry["bodies"]) > 1:
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=entry["bodies"][encoding], media_type=entry["media_type"], headers=headers)
 
 
 # ========================================
@@ -126,41 +379,46 @@ def health():
 # Issue 看板路由 (/issues)
 # ========================================
 
+def rewrite_api_paths(content: bytes) -> bytes:
+    """将页面中的 /api/ 替换为 /issues/api/"""
+    content = content.decode("utf-8")
+    content = content.replace("'/api/", "'/issues/api/")
+    content = content.replace('"/api/', '"/issues/api/')
+    content = content.replace('`/api/', '`/issues/api/')
+    content = content.replace('fetch("/api', 'fetch("/issues/api')
+    content = content.replace("fetch('/api", "fetch('/issues/api")
+    content = content.replace("fetch(`/api", "fetch(`/issues/api")
+    return content.encode("utf-8")
+
+
 @app.get("/issues", response_class=HTMLResponse)
-def issues_dashboard():
+async def issues_dashboard(request: Request):
     """Issue 看板页面"""
-    index_file = WEB_DIR / "index.html"
-    if index_file.exists():
-        # 读取并修改 API 路径
-        content = index_file.read_text(encoding="utf-8")
-        # 将 /api/ 替换为 /issues/api/
-        content = content.replace("'/api/", "'/issues/api/")
-        content = content.replace('"/api/', '"/issues/api/')
-        content = content.replace('`/api/', '`/issues/api/')
-        content = content.replace('fetch("/api', 'fetch("/issues/api')
-        content = content.replace("fetch('/api", "fetch('/issues/api")
-        content = content.replace("fetch(`/api", "fetch(`/issues/api")
-        return HTMLResponse(content=content)
-    return HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
+    response = await serve_asset(request, WEB_DIR / "index.html", transform=rewrite_api_paths)
+    return response or HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
+
+
+@app.get("/usage.html", response_class=HTMLResponse)
+@app.get("/issues/usage", response_class=HTMLResponse)
+async def usage_page(request: Request):
+    """Token 使用统计页面"""
+    response = await serve_asset(request, WEB_DIR / "usage.html")
+    return response or HTMLResponse(content="<h1>Usage page not found</h1>", status_code=404)
 
 
 @app.get("/issues/dashboard", response_class=HTMLResponse)
 @app.get("/issues/dashboard/", response_class=HTMLResponse)
-def issues_dashboard_page():
+async def issues_dashboard_page(request: Request):
     """Issue Dashboard 页面（兼容旧路径）"""
-    dashboard_file = WEB_DIR / "dashboard" / "index.html"
-    if dashboard_file.exists():
-        return HTMLResponse(content=dashboard_file.read_text(encoding="utf-8"))
-    return HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
+    response = await serve_asset(request, WEB_DIR / "dashboard" / "index.html")
+    return response or HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
 
 
 @app.get("/issues/dashboard/data.json")
-def issues_dashboard_data():
+async def issues_dashboard_data(request: Request):
     """Dashboard 数据（兼容旧路径）"""
-    data_file = WEB_DIR / "dashboard" / "data.json"
-    if data_file.exists():
-        return JSONResponse(content=json.loads(data_file.read_text(encoding="utf-8")))
-    return JSONResponse(content={"error": "Data not found"}, status_code=404)
+    response = await serve_asset(request, WEB_DIR / "dashboard" / "data.json")
+    return response or FastJSONResponse(content={"error": "Data not found"}, status_code=404)
 
 
 # ========================================
@@ -169,21 +427,17 @@ def issues_dashboard_data():
 
 @app.get("/dashboard", response_class=HTMLResponse)
 @app.get("/dashboard/", response_class=HTMLResponse)
-def dashboard_main():
+async def dashboard_main(request: Request):
     """独立 Dashboard 页面 - loryonclaw.me/dashboard"""
-    dashboard_file = WEB_DIR / "dashboard" / "index.html"
-    if dashboard_file.exists():
-        return HTMLResponse(content=dashboard_file.read_text(encoding="utf-8"))
-    return HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
+    response = await serve_asset(request, WEB_DIR / "dashboard" / "index.html")
+    return response or HTMLResponse(content="<h1>Dashboard not found</h1>", status_code=404)
 
 
 @app.get("/dashboard/data.json")
-def dashboard_main_data():
+async def dashboard_main_data(request: Request):
     """Dashboard 数据"""
-    data_file = WEB_DIR / "dashboard" / "data.json"
-    if data_file.exists():
-        return JSONResponse(content=json.loads(data_file.read_text(encoding="utf-8")))
-    return JSONResponse(content={"error": "Data not found"}, status_code=404)
+    response = await serve_asset(request, WEB_DIR / "dashboard" / "data.json")
+    return response or FastJSONResponse(content={"error": "Data not found"}, status_code=404)
 
 
 # ========================================
@@ -191,113 +445,417 @@ def dashboard_main_data():
 # ========================================
 
 @app.get("/issues/api/issues")
-def get_issues():
+async def get_issues(request: Request):
     """获取所有 Issue 列表"""
-    data = load_index()
-    issues = data.get("issues", [])
-    # 按 ID 倒序排列（最新的在前）
-    issues = sorted(issues, key=lambda x: x.get("id", 0), reverse=True)
-    return {"issues": issues, "total": len(issues)}
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot_response(request, snapshot, "issues")
 
+    validators = await run_io(cache_validators, "issues", INDEX_FILE)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    data = await run_io(load_index)
+    return FastJSONResponse(content=build_issue_list(data.get("issues", [])), headers=validators)
 
-def parse_markdown_content(content: str) -> dict:
-    """解析 Markdown 文件，提取 frontmatter 和 body"""
-    result = {"body": "", "progress_history": [], "deliverables": []}
-    
-    lines = content.split("\n")
-    body_lines = []
-    
-    i = 0
-    # 跳过 frontmatter
-    if lines and lines[0].strip() == "---":
-        i = 1
-        while i < len(lines) and lines[i].strip() != "---":
-            i += 1
-        i += 1  # 跳过结束的 ---
-    
-    # 收集所有正文内容
-    while i < len(lines):
-        body_lines.append(lines[i])
-        i += 1
-    
-    result["body"] = "\n".join(body_lines).strip()
-    return result
+
+def build_issue_list(issues: list) -> dict:
+    """Issue 列表响应（按 ID 倒序，最新的在前）"""
+    issues = sorted(issues, key=lambda x: x.get("id", 0), reverse=True)
+    return {"issues": issues, "total": len(issues)}
 
 
 def load_progress(issue_id: int) -> list:
-    """从 progress.jsonl 加载指定 Issue 的进度记录"""
-    progress_list = []
-    if PROGRESS_FILE.exists():
-        with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        record = json.loads(line)
-                        if record.get('issue_id') == issue_id:
-                            progress_list.append(record)
-                    except json.JSONDecodeError:
-                        continue
-    # 按时间倒序排列（最新的在前）
+    """指定 Issue 的进度记录（最新的在前）"""
+    progress_list = store.progress(issue_id)
     progress_list.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
     return progress_list
 
 
-def load_deliverables(issue_id: int) -> list:
-    """从 deliverables/index.json 加载指定 Issue 的交付物"""
-    deliverables_list = []
-    if DELIVERABLES_FILE.exists():
+def load_progress_batch(issue_ids) -> dict:
+    """按 Issue ID 分组的进度记录（最新的在前）"""
+    progress_by_issue = store.progress_batch(issue_ids)
+    for records in progress_by_issue.values():
+        records.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+    return progress_by_issue
+
+
+def load_issue_body(issue: dict) -> dict:
+    """读取 Markdown 正文写入 issue["content"] / issue["body"]"""
+    loaded = store.issue_content(issue)
+    if loaded:
+        issue["content"], issue["body"] = loaded
+    else:
+        # 如果文件不存在，使用 resolution 作为 body
+        resolution = issue.get("resolution", "")
+        if resolution:
+            issue["body"] = f"## 解决方案\n\n{resolution}"
+        else:
+            issue["body"] = f"## {issue.get('title', 'Issue')}\n\n状态: {issue.get('status', 'unknown')}\n优先级: {issue.get('priority', 'unknown')}\n负责人: {issue.get('assignee', 'unassigned')}"
+    return issue
+
+
+def build_issue_detail(issue: dict) -> dict:
+    """补全 Issue 详情：正文、进度记录和交付物（issue 为 store.get_issue 返回的副本）"""
+    issue_id = issue.get("id")
+    load_issue_body(issue)
+    issue["progress_history"] = load_progress(issue_id)
+    issue["deliverables"] = store.deliverables(issue_id)
+    return issue
+
+
+def build_issue_details(issues: list, body: bool, progress: bool, deliverables: bool) -> dict:
+    """批量补全 Issue 详情：进度和交付物各按索引取一次"""
+    ids = [issue.get("id") for issue in issues]
+    progress_by_issue = load_progress_batch(ids) if progress else {}
+    deliverables_by_issue = store.deliverables_batch(ids) if deliverables else {}
+
+    details = {}
+    for issue in issues:
+        issue_id = issue.get("id")
+        if body:
+            load_issue_body(issue)
+        if progress:
+            issue["progress_history"] = progress_by_issue[issue_id]
+        if deliverables:
+            issue["deliverables"] = deliverables_by_issue[issue_id]
+        details[str(issue_id)] = issue
+    return details
+
+
+def snapshot_issues(snapshot, issue_ids) -> dict:
+    """从快照取 Issue：{id: (元数据副本, 三段原始 JSON)}，不存在的 ID 不出现在结果中"""
+    found = {}
+    for issue_id in issue_ids:
+        parts = snapshot.lookup(issue_id)
+        if parts is not None:
+            found[issue_id] = (json_codec.loads(bytes(parts[0])), parts)
+    return found
+
+
+def apply_snapshot_parts(issue: dict, parts, body: bool = True, progress: bool = True, deliverables: bool = True) -> dict:
+    """用快照中的进度（已按时间倒序）和交付物补全 Issue 详情"""
+    if body:
+        load_issue_body(issue)
+    if progress:
+        issue["progress_history"] = json_codec.loads(bytes(parts[1]))
+    if deliverables:
+        issue["deliverables"] = json_codec.loads(bytes(parts[2]))
+    return issue
+
+
+BATCH_MAX_IDS = 200
+
+
+def parse_id_list(value: str) -> list:
+    """解析逗号分隔的 Issue ID 列表（去重并保持顺序）"""
+    ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
         try:
-            data = json.loads(DELIVERABLES_FILE.read_text(encoding='utf-8'))
-            for item in data.get('deliverables', []):
-                if item.get('issue_id') == issue_id:
-                    deliverables_list.append(item)
-        except json.JSONDecodeError:
-            pass
-    return deliverables_list
+            issue_id = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid issue id: {part}")
+        if issue_id not in ids:
+            ids.append(issue_id)
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    return ids
+
+
+@app.get("/issues/api/issues:batch")
+async def get_issues_batch(
+    request: Request,
+    ids: str = Query(..., description="逗号分隔的 Issue ID，如 1,2,3"),
+    body: bool = Query(True, description="是否包含 Markdown 正文"),
+    progress: bool = Query(True, description="是否包含进度记录"),
+    deliverables: bool = Query(True, description="是否包含交付物"),
+):
+    """批量获取 Issue 详情，返回以 ID 为键的映射（不存在的 ID 列在 missing 中）"""
+    requested = parse_id_list(ids)
+    tag = f"issues-batch?{','.join(map(str, requested))}&{int(body)}{int(progress)}{int(deliverables)}"
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        from_snapshot = snapshot_issues(snapshot, requested)
+        found = {issue_id: issue for issue_id, (issue, _) in from_snapshot.items()}
+        digest = section_etag(b"".join(bytes(part) for _, parts in from_snapshot.values() for part in parts))
+        tag = f"{tag}:{digest}"
+        sources = []
+    else:
+        found = await run_io(store.get_issues, requested)
+        sources = [INDEX_FILE]
+        if progress:
+            sources.append(PROGRESS_FILE)
+        if deliverables:
+            sources.append(DELIVERABLES_FILE)
+    issues = [found[issue_id] for issue_id in requested if issue_id in found]
+    missing = [issue_id for issue_id in requested if issue_id not in found]
+
+    if body:
+        sources.extend(path for path in map(store.issue_path, issues) if path)
+    validators = await run_io(cache_validators, tag, *sources)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    if snapshot is not None:
+        details = {}
+        for issue_id in requested:
+            if issue_id in from_snapshot:
+                issue, parts = from_snapshot[issue_id]
+                details[str(issue_id)] = await run_io(apply_snapshot_parts, issue, parts, body, progress, deliverables)
+    else:
+        details = await run_io(build_issue_details, issues, body, progress, deliverables)
+    return FastJSONResponse(
+        content={"issues": details, "missing": missing, "total": len(details)},
+        headers=validators,
+    )
 
 
 @app.get("/issues/api/issues/{issue_id}")
-def get_issue(issue_id: int):
+async def get_issue(issue_id: int, request: Request):
     """获取单个 Issue 详情"""
-    data = load_index()
-    for issue in data.get("issues", []):
-        if issue.get("id") == issue_id:
-            # 尝试读取 Markdown 文件内容
-            file_path = issue.get("file", "")
-            file_exists = False
-            if file_path:
-                full_path = ISSUES_DIR.parent / file_path
-                if full_path.exists():
-                    file_exists = True
-                    content = full_path.read_text(encoding="utf-8")
-                    issue["content"] = content
-                    # 解析 Markdown 内容
-                    parsed = parse_markdown_content(content)
-                    issue["body"] = parsed["body"]
-            
-            # 如果文件不存在，使用 resolution 作为 body
-            if not file_exists:
-                resolution = issue.get("resolution", "")
-                if resolution:
-                    issue["body"] = f"## 解决方案\n\n{resolution}"
-                else:
-                    issue["body"] = f"## {issue.get('title', 'Issue')}\n\n状态: {issue.get('status', 'unknown')}\n优先级: {issue.get('priority', 'unknown')}\n负责人: {issue.get('assignee', 'unassigned')}"
-            
-            # 加载进度记录和交付物
-            issue["progress_history"] = load_progress(issue_id)
-            issue["deliverables"] = load_deliverables(issue_id)
-            
-            return issue
-    raise HTTPException(status_code=404, detail=f"Issue #{issue_id} not found")
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        issue, parts = snapshot_issues(snapshot, [issue_id]).get(issue_id, (None, None))
+        # 快照中三段 JSON 的摘要代替 index / 进度日志 / 交付物索引的文件版本
+        tag = f"issue-{issue_id}:{section_etag(b''.join(bytes(part) for part in parts))}" if parts else ""
+        sources = []
+    else:
+        issue = await run_io(store.get_issue, issue_id)
+        tag = f"issue-{issue_id}"
+        sources = [INDEX_FILE, PROGRESS_FILE, DELIVERABLES_FILE]
+    if issue is None:
+        raise HTTPException(status_code=404, detail=f"Issue #{issue_id} not found")
 
+    # 详情依赖 index、Markdown 文件、进度日志和交付物索引
+    full_path = store.issue_path(issue)
+    if full_path:
+        sources.append(full_path)
+    validators = await run_io(cache_validators, tag, *sources)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
 
-@app.get("/issues/api/stats")
-def get_stats():
-    """获取统计数据"""
-    data = load_index()
-    issues = data.get("issues", [])
-    
+    if snapshot is not None:
+        issue = await run_io(apply_snapshot_parts, issue, parts)
+    else:
+        issue = await run_io(build_issue_detail, issue)
+    return FastJSONResponse(content=issue, headers=validators)
+
+
+# ========================================
+# 交付物下载
+# ========================================
+
+# 流式下载每次读取的块大小
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def deliverable_rel(name: str) -> str:
+    """规范化 Issue 目录内的相对路径，拒绝绝对路径和 .."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        raise HTTPException(status_code=400, detail=f"Invalid deliverable path: {name}")
+    return "/".join(parts)
+
+
+def find_deliverable(issue_id: int, rel: str):
+    """找出 rel 对应的文件，返回 (是否目录, [(Issue 目录内相对路径, 来源)])，找不到时列表为空
+
+    来源是 {"size", "mtime", "digest", "path"}（Issue 目录中的文件）或
+    {"size", "mtime", "digest", "archive", "member"}（冷存储归档中的成员）；
+    归档后又重新添加的同名文件以 Issue 目录中的为准。digest 优先取清单 / 归档索引中的 sha256，
+    文件从目录移入归档前后 ETag 不变；文件的 inode / mtime 与清单记录不符时退回 stat。
+    """
+    name = f"issue-{issue_id:03d}"
+    issue_dir = DELIVERABLES_DIR / name
+    prefix = rel + "/"
+    sources = {}
+
+    archive_index = cold_storage.load_index(DELIVERABLES_DIR / "archive", issue_id)
+    if archive_index:
+        archive_file = DELIVERABLES_DIR / "archive" / archive_index["archive"]
+        archived_at = archive_file.stat().st_mtime if archive_file.exists() else 0
+        for member_rel, member in archive_index["members"].items():
+            if member_rel == rel or member_rel.startswith(prefix):
+                sources[member_rel] = {"size": member["size"], "mtime": archived_at, "digest": member["sha256"],
+                                       "archive": archive_file, "member": member}
+
+    target = issue_dir / rel
+    if target.exists() and target.resolve().is_relative_to(issue_dir.resolve()):
+        manifest = {}
+        manifest_file = DELIVERABLES_DIR / "manifests" / f"{name}.json"
+        if manifest_file.exists():
+            try:
+                manifest = json_codec.load_file(manifest_file).get("files", {})
+            except (ValueError, OSError):
+                pass
+        paths = [target] if target.is_file() else sorted(p for p in target.rglob("*") if p.is_file())
+        for path in paths:
+            member_rel = path.relative_to(issue_dir).as_posix()
+            st = path.stat()
+            known = manifest.get(member_rel)
+            # 只有文件仍是清单记录的那一个（inode、mtime、大小都一致）才信任 sha256，
+            # 原地改写、替换或 clone 后重建的文件按 stat 算 ETag
+            trusted = (known and known["size"] == st.st_size and known.get("inode") == st.st_ino
+                       and known.get("inode_mtime_ns") == st.st_mtime_ns)
+            digest = known["sha256"] if trusted else (st.st_ino, st.st_size, st.st_mtime_ns)
+            sources[member_rel] = {"size": st.st_size, "mtime": st.st_mtime, "digest": digest, "path": path}
+
+    return rel not in sources, sorted(sources.items())
+
+
+def iter_source(source: dict, start: int = 0, end: int = None):
+    """按块读取来源的 [start, end) 区间"""
+    if "archive" in source:
+        yield from cold_storage.iter_member(source["archive"], source["member"], start, end, DOWNLOAD_CHUNK_SIZE)
+        return
+    end = source["size"] if end is None else end
+    with open(source["path"], "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class ZipSink:
+    """zipfile 的只写输出：写入的字节留在内存里，由 drain 取走（不可 seek，zipfile 自动改用数据描述符）"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_zip(rel: str, sources):
+    """把目录下的文件边读边压缩成 zip 流，不写临时文件；zip 内以目录名为顶层"""
+    base = rel.rsplit("/", 1)[0] + "/" if "/" in rel else ""
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+        for member_rel, source in sources:
+            mtime = time.localtime(max(source["mtime"], 315532800))  # zip 时间戳不早于 1980 年
+            info = zipfile.ZipInfo(member_rel[len(base):], mtime[:6])
+            info.external_attr = 0o644 << 16
+            info.compress_type = (zipfile.ZIP_STORED if Path(member_rel).suffix.lower() in cold_storage.STORED_SUFFIXES
+                                  else zipfile.ZIP_DEFLATED)
+            with zf.open(info, "w", force_zip64=source["size"] > zipfile.ZIP64_LIMIT) as dst:
+                for chunk in iter_source(source):
+                    dst.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+async def stream_in_io(chunks):
+    """在 I/O 线程池中逐块推进同步生成器，供 StreamingResponse 使用"""
+    try:
+        while True:
+            chunk = await run_io(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await run_io(chunks.close)
+
+
+def parse_range(header: str, size: int):
+    """解析 Range 头中的单个字节区间，返回 [start, end)
+
+    多个区间或非 bytes 单位返回 None（按整个文件响应）；区间无法满足时抛出 ValueError
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, sep, last = ranges.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+        else:
+            start, end = max(0, size - int(last)), size
+    except ValueError:
+        return None
+    end = min(end, size)
+    if start >= end:
+        raise ValueError(header)
+    return start, end
+
+
+def content_disposition(filename: str) -> str:
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace('"', "_").replace("?", "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+@app.api_route("/issues/api/issues/{issue_id}/deliverables/{name:path}", methods=["GET", "HEAD"])
+async def download_deliverable(issue_id: int, name: str, request: Request):
+    """下载交付物文件（支持 Range / ETag）；目录以 zip 流式返回，已归档的交付物从归档中读取"""
+    rel = deliverable_rel(name)
+    is_dir, sources = await run_io(find_deliverable, issue_id, rel)
+    if not sources:
+        raise HTTPException(status_code=404, detail=f"Deliverable {rel} of issue #{issue_id} not found")
+
+    validators = make_validators(f"deliverable:{issue_id}:{rel}:{int(is_dir)}",
+                                 [(member_rel, source["digest"]) for member_rel, source in sources],
+                                 max(source["mtime"] for _, source in sources))
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    filename = rel.rsplit("/", 1)[-1]
+    head = request.method == "HEAD"
+    if is_dir:
+        # 边生成边发送，长度事先未知：分块传输，不支持 Range
+        headers = {**validators, "Content-Disposition": content_disposition(f"{filename}.zip")}
+        if head:
+            return Response(headers=headers, media_type="application/zip")
+        return StreamingResponse(stream_in_io(iter_zip(rel, sources)), media_type="application/zip", headers=headers)
+
+    source = sources[0][1]
+    size = source["size"]
+    headers = {**validators, "Accept-Ranges": "bytes", "Content-Disposition": content_disposition(filename)}
+    start, end, status = 0, size, 200
+    range_header = request.headers.get("range")
+    # If-Range 与当前 ETag 不一致时（文件已变化）忽略 Range，返回完整内容
+    if range_header and request.headers.get("if-range", validators["ETag"]) == validators["ETag"]:
+        try:
+            requested = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if requested:
+            start, end = requested
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if head:
+        return Response(status_code=status, headers=headers, media_type=media_type)
+    return StreamingResponse(stream_in_io(iter_source(source, start, end)), status_code=status,
+                             media_type=media_type, headers=headers)
+
+
+def build_stats(issues: list) -> dict:
+    """按状态、优先级、负责人统计"""
     stats = {
         "total": len(issues),
         "by_status": {},
@@ -317,16 +875,11 @@ def get_stats():
         # 按负责人统计
         assignee = issue.get("assignee", "unassigned")
         stats["by_assignee"][assignee] = stats["by_assignee"].get(assignee, 0) + 1
-    
     return stats
 
 
-@app.get("/issues/api/agents")
-def get_agents():
-    """获取所有负责人列表"""
-    data = load_index()
-    issues = data.get("issues", [])
-    
+def build_agents(issues: list) -> dict:
+    """按负责人汇总 Issue 数"""
     agents = {}
     for issue in issues:
         assignee = issue.get("assignee", "unassigned")
@@ -337,138 +890,339 @@ def get_agents():
             agents[assignee]["closed"] += 1
         else:
             agents[assignee]["open"] += 1
-    
     return {"agents": list(agents.values())}
 
 
+@app.get("/issues/api/stats")
+async def get_stats(request: Request):
+    """获取统计数据"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot_response(request, snapshot, "stats")
+
+    validators = await run_io(cache_validators, "stats", INDEX_FILE)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    data = await run_io(load_index)
+    stats = build_stats(data.get("issues", []))
+    return FastJSONResponse(content=stats, headers=validators)
+
+
+@app.get("/issues/api/agents")
+async def get_agents(request: Request):
+    """获取所有负责人列表"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot_response(request, snapshot, "agents")
+
+    validators = await run_io(cache_validators, "agents", INDEX_FILE)
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    data = await run_io(load_index)
+    agents = build_agents(data.get("issues", []))
+    return FastJSONResponse(content=agents, headers=validators)
+
+
 # ========================================
-# Token/Usage Dashboard API
+# Issue 变更事件流 (SSE)
 # ========================================
 
-def load_session_transcripts():
-    """从 agents 目录加载 session transcript 文件获取 usage 数据"""
-    agents_dir = Path.home() / ".openclaw/agents"
-    sessions = []
-    
-    if not agents_dir.exists():
-        return sessions
-    
-    # 遍历所有 agent 目录
-    for agent_dir in agents_dir.iterdir():
-        if not agent_dir.is_dir():
-            continue
-        
-        agent_name = agent_dir.name
-        sessions_dir = agent_dir / "sessions"
-        
-        if not sessions_dir.exists():
-            continue
-        
-        for jsonl_file in sessions_dir.glob("*.jsonl"):
+class IssueEventFeed:
+    """监听 .issues/ 目录变化，转换为 Issue 事件供 SSE 推送
+
+    以轮询 stat 的方式观察 index.json 和 progress.jsonl：
+    - index.json 变化时与上一份快照逐条比较，产生 issue.created / issue.assigned /
+      issue.closed / issue.updated / issue.deleted 事件
+    - progress.jsonl 增长时只读取新追加的字节，产生 progress.appended 事件
+
+    最近的事件保存在环形缓冲区中，客户端可通过 Last-Event-ID 断点续传；
+    缓冲区已覆盖不到的 ID（或服务器重启后的旧 ID）会收到 reset 事件，由客户端全量刷新。
+    """
+
+    def __init__(self, poll_interval: float = 0.5, max_events: int = 1000):
+        self.poll_interval = poll_interval
+        self.events = deque(maxlen=max_events)
+        self.seq = 0
+        self.boot_id = format(int(time.time()), "x")
+        self._issues = {}
+        self._index_version = None
+        self._progress_version = None
+        self._progress_offset = 0
+        self._task = None
+        self._condition = None
+        self._start_lock = None
+
+    async def ensure_started(self):
+        """首次订阅时启动后台轮询任务（初始快照要读文件，放到 IO 线程池）"""
+        if self._task is not None and not self._task.done():
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            # 等锁期间可能已由另一个订阅者启动
+            if self._task is None or self._task.done():
+                self._condition = asyncio.Condition()
+                await run_io(self._snapshot)
+                self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @staticmethod
+    def _version(path: Path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _snapshot(self):
+        """记录当前状态作为比较基准（不产生事件）"""
+        self._index_version = self._version(INDEX_FILE)
+        self._issues = self._read_issues()
+        self._progress_version = self._version(PROGRESS_FILE)
+        self._progress_offset = self._progress_version[1] if self._progress_version else 0
+
+    def _read_issues(self) -> dict:
+        try:
+            return {i.get("id"): i for i in load_index().get("issues", [])}
+        except (OSError, json.JSONDecodeError):
+            # 写入过程中可能读到半个文件，保留上一份快照等待下次轮询
+            return self._issues
+
+    async def _run(self):
+        while True:
             try:
-                session_id = jsonl_file.stem
-                total_input = 0
-                total_output = 0
-                total_cost = 0
-                request_count = 0
-                last_model = ""
-                last_timestamp = None
-                
-                with open(jsonl_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            record = json.loads(line)
-                            # 检查 message 类型的记录
-                            if record.get('type') == 'message':
-                                msg = record.get('message', {})
-                                if msg.get('role') == 'assistant' and 'usage' in msg:
-                                    usage = msg['usage']
-                                    total_input += usage.get('input', 0)
-                                    total_output += usage.get('output', 0)
-                                    if 'cost' in usage and isinstance(usage['cost'], dict):
-                                        total_cost += usage['cost'].get('total', 0)
-                                    request_count += 1
-                                    last_model = msg.get('model', '')
-                                    if 'timestamp' in record:
-                                        last_timestamp = record['timestamp']
-                        except json.JSONDecodeError:
-                            continue
-                
-                if request_count > 0:
-                    sessions.append({
-                        "session_id": session_id,
-                        "agent": agent_name,
-                        "input_tokens": total_input,
-                        "output_tokens": total_output,
-                        "total_tokens": total_input + total_output,
-                        "cost": total_cost,
-                        "requests": request_count,
-                        "model": last_model,
-                        "last_activity": last_timestamp
-                    })
+                changes = await asyncio.to_thread(self.poll)
             except Exception:
+                changes = []
+            if changes:
+                async with self._condition:
+                    for event_type, data in changes:
+                        self.seq += 1
+                        self.events.append({"seq": self.seq, "type": event_type, "data": data})
+                    self._condition.notify_all()
+            await asyncio.sleep(self.poll_interval)
+
+    def poll(self) -> list:
+        """检查一次文件变化，返回 [(event_type, data), ...]"""
+        changes = []
+
+        index_version = self._version(INDEX_FILE)
+        if index_version != self._index_version:
+            self._index_version = index_version
+            current = self._read_issues()
+            for issue_id, issue in current.items():
+                old = self._issues.get(issue_id)
+                if old is None:
+                    changes.append(("issue.created", {"issue": issue}))
+                elif old != issue:
+                    if issue.get("status") == "closed" and old.get("status") != "closed":
+                        event_type = "issue.closed"
+                    elif issue.get("assignee") != old.get("assignee"):
+                        event_type = "issue.assigned"
+                    else:
+                        event_type = "issue.updated"
+                    changes.append((event_type, {"issue": issue}))
+            for issue_id in self._issues.keys() - current.keys():
+                changes.append(("issue.deleted", {"id": issue_id}))
+            self._issues = current
+
+        progress_version = self._version(PROGRESS_FILE)
+        if progress_version != self._progress_version:
+            old_version = self._progress_version
+            self._progress_version = progress_version
+            if progress_version is None:
+                self._progress_offset = 0
+            elif old_version is None or progress_version[0] != old_version[0] or progress_version[1] < self._progress_offset:
+                # 文件被替换或截断，无法确定增量，通知客户端全量刷新
+                self._progress_offset = progress_version[1]
+                changes.append(("reset", {}))
+            else:
+                changes.extend(self._read_appended_progress())
+
+        return changes
+
+    def _read_appended_progress(self) -> list:
+        changes = []
+        with open(PROGRESS_FILE, "rb") as f:
+            f.seek(self._progress_offset)
+            chunk = f.read()
+        # 只消费完整的行，未写完的行留到下次
+        end = chunk.rfind(b"\n") + 1
+        self._progress_offset += end
+        for line in chunk[:end].splitlines():
+            line = line.strip()
+            if not line:
                 continue
-    
-    # 按总 token 数排序
-    sessions.sort(key=lambda x: x['total_tokens'], reverse=True)
-    return sessions
+            try:
+                record = json_codec.loads(line)
+            except json.JSONDecodeError:
+                continue
+            changes.append(("progress.appended", {"progress": record}))
+        return changes
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.boot_id}-{seq}"
+
+    def resume_seq(self, last_event_id):
+        """把 Last-Event-ID 转换为序号；无法续传时返回 None"""
+        if not last_event_id:
+            return self.seq
+        boot_id, _, seq = last_event_id.partition("-")
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self.events[0]["seq"] if self.events else self.seq + 1
+        if seq > self.seq or seq < oldest - 1:
+            return None
+        return seq
+
+    async def wait(self, after_seq: int, timeout: float) -> list:
+        """等待序号大于 after_seq 的事件，超时返回空列表"""
+        async with self._condition:
+            try:
+                await asyncio.wait_for(self._condition.wait_for(lambda: self.seq > after_seq), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return [e for e in self.events if e["seq"] > after_seq]
+
+
+issue_feed = IssueEventFeed()
+
+
+def format_sse(event_type: str, data: dict, event_id: str = None) -> str:
+    """格式化为 text/event-stream 消息"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json_codec.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@app.get("/issues/api/events")
+async def issue_events(request: Request):
+    """Issue 变更事件流（SSE），支持 Last-Event-ID 续传"""
+    await issue_feed.ensure_started()
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        cursor = issue_feed.resume_seq(last_event_id)
+        if cursor is None:
+            cursor = issue_feed.seq
+            yield format_sse("reset", {}, issue_feed.event_id(cursor))
+        else:
+            # 先下发当前位置，保证断线重连时浏览器能带上 Last-Event-ID
+            yield format_sse("ready", {}, issue_feed.event_id(cursor))
+        while not await request.is_disconnected():
+            events = await issue_feed.wait(cursor, timeout=15)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                cursor = event["seq"]
+                yield format_sse(event["type"], event["data"], issue_feed.event_id(cursor))
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ========================================
+# Token/Usage Dashboard API
+# ========================================
+
+usage_ingester = UsageIngester()
 
 
 @app.get("/issues/api/usage")
-def get_usage():
-    """获取 Token 使用统计"""
-    sessions = load_session_transcripts()
-    
-    # 汇总统计
-    total_input = sum(s['input_tokens'] for s in sessions)
-    total_output = sum(s['output_tokens'] for s in sessions)
-    total_requests = sum(s['requests'] for s in sessions)
-    total_cost = sum(s['cost'] for s in sessions)
-    
-    # 按 agent 分组
-    by_agent = {}
-    for s in sessions:
-        agent = s.get('agent', 'unknown')
-        if agent not in by_agent:
-            by_agent[agent] = {
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "total_tokens": 0,
-                "requests": 0,
-                "cost": 0,
-                "sessions": 0
-            }
-        by_agent[agent]["input_tokens"] += s['input_tokens']
-        by_agent[agent]["output_tokens"] += s['output_tokens']
-        by_agent[agent]["total_tokens"] += s['total_tokens']
-        by_agent[agent]["requests"] += s['requests']
-        by_agent[agent]["cost"] += s['cost']
-        by_agent[agent]["sessions"] += 1
-    
-    # 转换为列表并排序
-    agents_list = [{"name": k, **v} for k, v in by_agent.items()]
-    agents_list.sort(key=lambda x: x['total_tokens'], reverse=True)
-    
-    # 加载 Like·AI 统计数据
-    likeai_stats = load_likeai_stats()
-    
-    return {
-        "summary": {
-            "total_input_tokens": total_input,
-            "total_output_tokens": total_output,
-            "total_tokens": total_input + total_output,
-            "total_requests": total_requests,
-            "total_cost": total_cost,
-            "session_count": len(sessions),
-            "agent_count": len(by_agent)
-        },
-        "by_agent": agents_list,
-        "sessions": sessions[:50],  # 返回前 50 个 session
-        "likeai": likeai_stats  # Like·AI 统计数据
-    }
+async def get_usage(request: Request):
+    """获取 Token 使用统计（读取后台增量采集的聚合结果）"""
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return snapshot_response(request, snapshot, "usage")
+
+    # 首次调用会同步采集一次，放到 CPU 线程池，不阻塞事件循环
+    await run_cpu(usage_ingester.ensure_started)
+    validators = await run_io(
+        version_validators, "usage", usage_ingester.generation, usage_ingester.updated_at, LIKEAI_CACHE_FILE
+    )
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    usage = await run_cpu(usage_ingester.usage)
+    return FastJSONResponse(content={
+        **usage,
+        "likeai": await run_io(load_likeai_stats)  # Like·AI 统计数据
+    }, headers=validators)
+
+
+def snapshot_ingester(snapshot) -> UsageIngester:
+    """用快照中的时间桶构造只读的 UsageIngester（不扫描 transcript，也不启动后台线程）"""
+    ingester = UsageIngester()
+    ingester.series = json_codec.loads(bytes(snapshot.section("usage_series")))
+    ingester.generation = snapshot.meta.get("usage_generation", 0)
+    ingester.updated_at = snapshot.meta.get("usage_updated_at", 0.0)
+    return ingester
+
+
+# 各粒度默认查询区间（秒）
+SERIES_DEFAULT_RANGE = {"hour": 7 * 86400, "day": 90 * 86400}
+
+
+def parse_time_param(value: str, name: str) -> float:
+    """解析 ISO 日期/时间或 epoch 秒形式的查询参数"""
+    if value.replace(".", "", 1).isdigit():
+        return float(value)
+    ts = parse_timestamp(value)
+    if ts is None:
+        raise HTTPException(status_code=400, detail=f"无法解析参数 {name}: {value}")
+    return ts
+
+
+@app.get("/issues/api/usage/series")
+async def get_usage_series(
+    request: Request,
+    granularity: str = "hour",
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+    agent: Optional[str] = None,
+):
+    """按小时/天聚合的 Token、费用和请求数时间序列（按 agent + model 拆分）"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity 只支持: {', '.join(GRANULARITIES)}")
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        ingester = await run_cpu(snapshot.cached, "usage_series", snapshot_ingester)
+    else:
+        ingester = usage_ingester
+        await run_cpu(ingester.ensure_started)
+    now = time.time()
+    # 没有 to 时区间随当前时间滑动：校验器带上当前桶的起点，进入新桶后不会再返回 304
+    current_bucket = 0 if to else int(now // GRANULARITIES[granularity] * GRANULARITIES[granularity])
+    validators = version_validators(
+        f"usage-series?{request.url.query}@{current_bucket}", ingester.generation,
+        max(ingester.updated_at, current_bucket)
+    )
+    cached = not_modified(request, validators)
+    if cached:
+        return cached
+
+    end = parse_time_param(to, "to") if to else now
+    start = parse_time_param(from_, "from") if from_ else end - SERIES_DEFAULT_RANGE[granularity]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from 必须早于 to")
+    try:
+        series = await run_cpu(ingester.usage_series, granularity, start, end, agent)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(content=series, headers=validators)
 
 
 # Like·AI 统计缓存文件
@@ -479,12 +1233,126 @@ def load_likeai_stats():
     """加载 Like·AI 统计数据（从缓存文件）"""
     if LIKEAI_CACHE_FILE.exists():
         try:
-            return json.loads(LIKEAI_CACHE_FILE.read_text(encoding='utf-8'))
+            return json_codec.load_file(LIKEAI_CACHE_FILE)
         except:
             return None
     return None
 
 
+# ========================================
+# 指标导出
+# ========================================
+
+def collect_ingest_metrics():
+    """抓取时刷新 transcript 采集相关的 Gauge（采集尚未启动时不导出延迟）"""
+    if usage_ingester.last_scan_at:
+        INGEST_LAG.set(max(0.0, time.time() - usage_ingester.last_scan_at))
+    INGEST_SCAN.set(usage_ingester.last_scan_seconds)
+    INGEST_BYTES.set(usage_ingester.bytes_ingested)
+    INGEST_GENERATION.set(usage_ingester.generation)
+
+
+metrics.add_collector(collect_ingest_metrics)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 文本格式指标"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+# ========================================
+# 共享快照加载进程（多 worker 模式）
+# ========================================
+
+class SnapshotLoader:
+    """唯一的加载者：数据源变化时重建快照并原子发布，generation 单调递增"""
+
+    def __init__(self, path: Path = SNAPSHOT_FILE, interval: float = 1.0):
+        self.path = path
+        self.interval = interval
+        self.generation = read_generation(path)
+        self._sources = None
+        self._thread = None
+
+    def _current_sources(self):
+        files = (INDEX_FILE, PROGRESS_FILE, DELIVERABLES_FILE, LIKEAI_CACHE_FILE)
+        return tuple(map(file_version, files)) + (usage_ingester.generation,)
+
+    def build(self):
+        """返回 (sections, issues)，格式见 snapshot.write_snapshot"""
+        all_issues = store.issues()
+        issues = [issue for issue in all_issues if isinstance(issue.get("id"), int)]
+        ids = [issue["id"] for issue in issues]
+        progress_by_issue = load_progress_batch(ids)
+        deliverables_by_issue = store.deliverables_batch(ids)
+        dumps = json_codec.dumps_bytes
+        records = [
+            (issue["id"], dumps(issue), dumps(progress_by_issue[issue["id"]]), dumps(deliverables_by_issue[issue["id"]]))
+            for issue in issues
+        ]
+        with usage_ingester.lock:
+            series = dumps(usage_ingester.series)
+        sections = {
+            "meta": dumps({"usage_generation": usage_ingester.generation, "usage_updated_at": usage_ingester.updated_at}),
+            "issues": dumps(build_issue_list(all_issues)),
+            "stats": dumps(build_stats(all_issues)),
+            "agents": dumps(build_agents(all_issues)),
+            "usage": dumps({**usage_ingester.usage(), "likeai": load_likeai_stats()}),
+            "usage_series": series,
+        }
+        return sections, records
+
+    def publish_if_changed(self) -> bool:
+        usage_ingester.ensure_started()
+        sources = self._current_sources()
+        if sources == self._sources:
+            return False
+        sections, records = self.build()
+        self.generation += 1
+        write_snapshot(self.path, self.generation, sections, records)
+        self._sources = sources
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="snapshot-loader", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """每 interval 秒检查一次数据源（阻塞）"""
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.publish_if_changed()
+            except Exception as e:
+                print(f"⚠️  快照发布失败: {e}", file=sys.stderr)
+
+
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8787)
+
+    parser = argparse.ArgumentParser(description="Issue Manager API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="大于 1 时本进程作为唯一加载者发布共享快照，worker 只映射快照")
+    parser.add_argument("--snapshot-loader", action="store_true",
+                        help="只运行快照加载者（配合外部启动、设置了 ISSUE_API_SNAPSHOT 的 worker）")
+    args = parser.parse_args()
+
+    if args.snapshot_loader:
+        loader = SnapshotLoader()
+        loader.publish_if_changed()
+        print(f"📦 快照已发布: {loader.path} (generation {loader.generation})")
+        loader.run()
+    elif args.workers > 1:
+        loader = SnapshotLoader()
+        loader.publish_if_changed()
+        loader.start()
+        # worker 由 uvicorn 以新进程启动，通过环境变量进入快照模式
+        os.environ["ISSUE_API_SNAPSHOT"] = str(loader.path)
+        uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers,
+                    app_dir=str(Path(__file__).resolve().parent))
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
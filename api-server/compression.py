@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+响应压缩
+- CompressionMiddleware: 对超过阈值的文本类响应按 Accept-Encoding 做 brotli / gzip 压缩
+- choose_encoding / compress: 供预压缩静态资源复用
+
+brotli 为可选依赖，未安装时只使用 gzip。
+流式响应（如 SSE）和已经带 Content-Encoding 的响应原样透传。
+"""
+
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 值得压缩的 Content-Type 前缀
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+)
+
+# 动态响应使用较快的压缩级别，预压缩资源使用最高级别
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+
+
+def supported_encodings() -> list:
+    """按优先级返回服务器支持的编码"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str, available=None):
+    """根据 Accept-Encoding 选出最合适的编码，不接受压缩时返回 None"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    for encoding in (supported_encodings() if available is None else available):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def weak_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    levels = STATIC_LEVELS if static else DYNAMIC_LEVELS
+    if encoding == "br":
+        return brotli.compress(data, quality=levels["br"])
+    return gzip.compress(data, compresslevel=levels["gzip"], mtime=0)
+
+
+class CompressionMiddleware:
+    """对单块响应体做 br / gzip 压缩（ASGI 中间件）"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            compressible = not (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or start_message["status"] in (204, 304)
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if compressible and "accept-encoding" not in headers.get("vary", "").lower():
+                # 无论本次是否压缩，响应内容都取决于 Accept-Encoding
+                headers.add_vary_header("Accept-Encoding")
+            if compressible and encoding:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # 编码后的字节与原始表示不同，强 ETag 降级为弱 ETag
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = weak_etag(etag)
+                message = {**message, "body": body}
+
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
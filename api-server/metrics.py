@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Prometheus 文本格式指标
+- Counter / Gauge / Histogram: 带标签的最小实现（线程安全），不依赖 prometheus_client
+- MetricsMiddleware: 按路由模板统计请求数和延迟直方图（ASGI 中间件）
+- Registry.render(): 输出 text exposition format 0.0.4
+
+抓取时才需要计算的值（如采集延迟）通过 Registry.add_collector 注册回调，在 render 前刷新。
+"""
+
+import math
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒；覆盖从缓存命中到冷采集的范围
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{escape_label(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self):
+        """[(后缀, 标签值, 附加标签, 值)]"""
+        with self._lock:
+            return [("", key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(self.labelnames, key, extra)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state["counts"]):
+                    cumulative += count
+                    result.append(("_bucket", key, (("le", format_value(bound)),), cumulative))
+                result.append(("_sum", key, (), state["sum"]))
+                result.append(("_count", key, (), state["count"]))
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, fn):
+        """抓取前调用的回调，用于刷新 Gauge"""
+        self._collectors.append(fn)
+
+    def render(self) -> bytes:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                continue
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class MetricsMiddleware:
+    """按路由模板统计请求数和耗时（ASGI 中间件）
+
+    路由模板取自 scope["route"]（如 /issues/api/issues/{issue_id}），避免按具体 ID 产生大量标签；
+    未匹配任何路由的请求记为 "<unmatched>"。耗时从收到请求到发出响应头（http.response.start）为止，
+    SSE 长连接和大文件下载的传输时间不计入延迟；text/event-stream 响应在连接期间计入 streams 仪表。
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram, streams: Gauge = None, skip_paths=("/metrics",)):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self.streams = streams
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        responded = False
+        streaming = False
+        method = scope.get("method", "")
+
+        def route_path():
+            return getattr(scope.get("route"), "path", "<unmatched>")
+
+        async def send_wrapper(message):
+            nonlocal status, responded, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                responded = True
+                self.latency.observe(time.perf_counter() - started, route=route_path(), method=method)
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if self.streams is not None and content_type.startswith(b"text/event-stream"):
+                    streaming = True
+                    self.streams.inc(route=route_path())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = route_path()
+            if not responded:
+                self.latency.observe(time.perf_counter() - started, route=path, method=method)
+            if streaming:
+                self.streams.dec(route=path)
+            self.requests.inc(route=path, method=method, status=status)
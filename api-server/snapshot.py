@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+多 worker 共享的只读快照文件
+
+加载进程把 index 派生的响应体、聚合结果和按 Issue 分组的记录序列化成一个不可变文件，
+写入临时文件后 os.replace 原子发布（发布即换 inode）。各 worker 以 mmap 只读映射，
+内容留在页缓存中，所有 worker 共用一份；worker 只在 inode 变化时重新映射，
+旧映射在最后一个引用释放后由 GC 关闭，正在发送的响应不受影响。
+
+文件格式（小端）:
+  header:  magic(8) generation(u64) created_at(f64) section_count(u32)
+  section: name(16, 补 0) offset(u64) length(u64)          × section_count
+  数据区:  各 section 的原始字节
+  "issue_index" section: 按 id 升序的定长条目
+           id(i64) + 3 × (offset(u64) length(u32))，分别指向
+           "records" / "progress" / "deliverables" section 内的 JSON 片段（section 名最长 16 字节）
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+import json_codec
+
+MAGIC = b"AIMSNAP\x01"
+HEADER = struct.Struct("<8sQdI")
+SECTION = struct.Struct("<16sQQ")
+INDEX_ENTRY = struct.Struct("<qQIQIQI")
+
+# 每条 Issue 对应的三段 JSON
+ISSUE_PARTS = ("records", "progress", "deliverables")
+
+
+def section_etag(data) -> str:
+    return hashlib.sha1(data).hexdigest()[:20]
+
+
+def read_generation(path: Path) -> int:
+    """已发布快照的 generation，文件不存在或损坏时为 0"""
+    try:
+        with open(path, "rb") as f:
+            magic, generation, _, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return generation if magic == MAGIC else 0
+
+
+def write_snapshot(path: Path, generation: int, sections: dict, issues: list) -> int:
+    """写入并原子发布快照，返回文件大小
+
+    sections: {name: bytes}，其中 "meta" 会自动补上各 section 的 ETag
+    issues:   [(id, record_bytes, progress_bytes, deliverables_bytes)]
+    """
+    parts = {name: bytearray() for name in ISSUE_PARTS}
+    index = bytearray()
+    for issue_id, *blobs in sorted(issues, key=lambda x: x[0]):
+        fields = [issue_id]
+        for name, blob in zip(ISSUE_PARTS, blobs):
+            fields += [len(parts[name]), len(blob)]
+            parts[name] += blob
+        index += INDEX_ENTRY.pack(*fields)
+
+    meta = dict(json_codec.loads(sections.pop("meta", b"{}")))
+    meta["etags"] = {name: section_etag(data) for name, data in sections.items()}
+    all_sections = {"meta": json_codec.dumps_bytes(meta), **sections, "issue_index": bytes(index)}
+    all_sections.update((name, bytes(data)) for name, data in parts.items())
+
+    offset = HEADER.size + SECTION.size * len(all_sections)
+    table = []
+    for name, data in all_sections.items():
+        table.append(SECTION.pack(name.encode("ascii"), offset, len(data)))
+        offset += len(data)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, generation, time.time(), len(all_sections)))
+        f.writelines(table)
+        f.writelines(all_sections.values())
+    os.replace(tmp, path)
+    return offset
+
+
+class Snapshot:
+    """一个已映射的快照（只读）"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, self.generation, self.created_at, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是快照文件: {path}")
+        self.sections = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        self.meta = json_codec.loads(bytes(self.section("meta")))
+        self._count = self.sections["issue_index"][1] // INDEX_ENTRY.size
+        self._local = {}
+
+    def section(self, name: str) -> memoryview:
+        """section 的零拷贝视图"""
+        offset, length = self.sections[name]
+        return self._view[offset:offset + length]
+
+    def etag(self, name: str) -> str:
+        return self.meta["etags"][name]
+
+    def cached(self, key, build):
+        """按快照缓存的派生对象（每个 worker 每个 generation 只构建一次）"""
+        value = self._local.get(key)
+        if value is None:
+            value = self._local[key] = build(self)
+        return value
+
+    def lookup(self, issue_id: int):
+        """二分查找 Issue，返回 (record, progress, deliverables) 三段 JSON 的视图，不存在时返回 None"""
+        base = self.sections["issue_index"][0]
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = INDEX_ENTRY.unpack_from(self._mmap, base + mid * INDEX_ENTRY.size)
+            if entry[0] < issue_id:
+                lo = mid + 1
+            elif entry[0] > issue_id:
+                hi = mid
+            else:
+                views = []
+                for i, name in enumerate(ISSUE_PARTS):
+                    offset, length = entry[1 + 2 * i], entry[2 + 2 * i]
+                    start = self.sections[name][0] + offset
+                    views.append(self._view[start:start + length])
+                return tuple(views)
+        return None
+
+
+class SnapshotReader:
+    """worker 侧：按需映射最新发布的快照
+
+    至多每 check_interval 秒 stat 一次文件，inode 变化（重新发布）时切换到新映射。
+    """
+
+    def __init__(self, path: Path, check_interval: float = 0.2):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """当前快照；尚未发布时返回 None"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                inode = self.path.stat().st_ino
+            except OSError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.inode != inode:
+                try:
+                    self._snapshot = Snapshot(self.path)
+                except (OSError, ValueError, struct.error):
+                    pass
+            return self._snapshot
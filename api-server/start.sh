@@ -13,4 +13,9 @@ echo "启动 Issue Manager API Server..."
 echo "API 地址: http://localhost:8787"
 echo "按 Ctrl+C 停止"
 
-python3 -m uvicorn api:app --host 0.0.0.0 --port 8787 --reload
+# API_WORKERS>1 时使用多 worker 模式：本进程加载数据并发布共享快照，worker 只映射快照
+if [ "${API_WORKERS:-1}" -gt 1 ]; then
+    python3 api.py --host 0.0.0.0 --port 8787 --workers "$API_WORKERS"
+else
+    python3 -m uvicorn api:app --host 0.0.0.0 --port 8787 --reload
+fi
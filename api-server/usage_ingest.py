@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Session transcript 增量采集
+后台线程定期扫描 ~/.openclaw/agents/*/sessions/*.jsonl，
+记住每个文件的 inode 和已读字节偏移，只解析新追加的行，
+并把 per-session / per-agent 聚合结果持久化到 .cache/ 下的状态文件。
+状态文件包含全部历史时间桶，写一次的代价随历史增长：有变化时只标记为脏，
+最多每 SAVE_INTERVAL 秒写一次，进程退出时再写入最后的变化。
+同时按 agent + model 维护小时级和天级（UTC）的时间桶，用于趋势图。
+
+/issues/api/usage 和 /issues/api/usage/series 只读取预先算好的结果，不再扫描 transcript。
+
+用法（手动执行一次采集）:
+  python3 usage_ingest.py
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 共享模块位于 scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import json_codec
+
+AGENTS_DIR = Path.home() / ".openclaw/agents"
+STATE_FILE = Path.home() / ".openclaw/shared/async-issue-manager/.cache/usage_ingest.json"
+
+# 返回给前端的 session 数量
+TOP_SESSIONS = 50
+
+# 两次写状态文件的最小间隔（秒）
+SAVE_INTERVAL = 60.0
+
+# 时间桶粒度（秒）
+GRANULARITIES = {"hour": 3600, "day": 86400}
+# 单次查询最多返回的桶数
+MAX_BUCKETS = 2000
+# 桶内数组的字段顺序
+BUCKET_FIELDS = ("input_tokens", "output_tokens", "cost", "requests")
+
+
+def parse_timestamp(value):
+    """把 transcript 中的时间戳（ISO 字符串或 epoch 秒/毫秒）转换为 epoch 秒"""
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else value
+    if isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def add_bucket(target: dict, key: str, values, sign: int = 1):
+    bucket = target.get(key)
+    if bucket is None:
+        bucket = target[key] = [0, 0, 0, 0]
+    for i, value in enumerate(values):
+        bucket[i] += sign * value
+    if sign < 0 and not bucket[3]:
+        del target[key]
+
+
+def empty_totals() -> dict:
+    return {
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "cost": 0,
+        "requests": 0,
+    }
+
+
+class UsageIngester:
+    """增量采集 transcript 并维护 usage 聚合"""
+
+    def __init__(self, agents_dir: Path = AGENTS_DIR, state_file: Path = STATE_FILE, interval: float = 5.0,
+                 save_interval: float = SAVE_INTERVAL):
+        self.agents_dir = agents_dir
+        self.state_file = state_file
+        self.interval = interval
+        self.save_interval = save_interval
+        # 内存中的聚合比状态文件新；saved_at 为上次写入的 monotonic 时间
+        self.dirty = False
+        self.saved_at = 0.0
+        self.lock = threading.Lock()
+        # path -> {"inode", "offset", "agent", "session_id"}
+        self.files = {}
+        # path -> session 聚合
+        self.sessions = {}
+        # agent -> agent 聚合
+        self.agents = {}
+        # 时间桶: granularity -> "agent\tmodel" -> bucket 起始 epoch -> [input, output, cost, requests]
+        self.series = {g: {} for g in GRANULARITIES}
+        # path -> {"model\thour": [...]}，记录每个 session 对小时桶的贡献，文件重置时据此扣除
+        self.session_buckets = {}
+        self.generation = 0
+        self.updated_at = 0.0
+        self.last_scan_at = 0.0
+        # 统计用：最近一次扫描耗时、本进程累计读取的 transcript 字节数
+        self.last_scan_seconds = 0.0
+        self.bytes_ingested = 0
+        self._payload = None
+        self._thread = None
+
+    # ----------------------------------------
+    # 状态持久化
+    # ----------------------------------------
+
+    def load_state(self):
+        """加载上次的偏移和聚合结果"""
+        if not self.state_file.exists():
+            return
+        try:
+            state = json_codec.load_file(self.state_file)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.files = state.get("files", {})
+        self.sessions = state.get("sessions", {})
+        self.agents = state.get("agents", {})
+        self.series = {g: state.get("series", {}).get(g, {}) for g in GRANULARITIES}
+        self.session_buckets = state.get("session_buckets", {})
+        self.generation = state.get("generation", 0)
+        self.updated_at = state.get("updated_at", 0.0)
+
+    def save_state(self):
+        """原子写入状态文件"""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix(".tmp")
+        json_codec.dump_file({
+            "files": self.files,
+            "sessions": self.sessions,
+            "agents": self.agents,
+            "series": self.series,
+            "session_buckets": self.session_buckets,
+            "generation": self.generation,
+            "updated_at": self.updated_at,
+        }, tmp)
+        os.replace(tmp, self.state_file)
+        self.dirty = False
+        self.saved_at = time.monotonic()
+
+    def maybe_save(self):
+        """有未保存的变化且距上次写入超过 save_interval 时写入（调用方持有 lock）"""
+        if self.dirty and time.monotonic() - self.saved_at >= self.save_interval:
+            self.save_state()
+
+    def flush(self):
+        """写入所有未保存的变化（进程退出时调用）"""
+        with self.lock:
+            if self.dirty:
+                self.save_state()
+
+    # ----------------------------------------
+    # 采集
+    # ----------------------------------------
+
+    def ingest_once(self) -> bool:
+        """扫描一次 transcript 目录，返回聚合结果是否有变化"""
+        seen = set()
+        changed = False
+        started = time.time()
+
+        if self.agents_dir.exists():
+            for jsonl_file in self.agents_dir.glob("*/sessions/*.jsonl"):
+                key = str(jsonl_file)
+                seen.add(key)
+                try:
+                    st = jsonl_file.stat()
+                except OSError:
+                    continue
+                entry = self.files.get(key)
+                if entry and entry["inode"] == st.st_ino and entry["offset"] == st.st_size:
+                    continue
+                try:
+                    changed |= self._ingest_file(jsonl_file, st, entry)
+                except Exception:
+                    continue
+
+        # 已删除的 transcript 不再计入统计
+        for key in list(self.files.keys() - seen):
+            self._drop_session(key)
+            del self.files[key]
+            changed = True
+
+        self.last_scan_at = time.time()
+        self.last_scan_seconds = self.last_scan_at - started
+        if changed:
+            self.generation += 1
+            self.updated_at = self.last_scan_at
+            self._payload = None
+        return changed
+
+    def _ingest_file(self, jsonl_file: Path, st, entry) -> bool:
+        key = str(jsonl_file)
+        agent = jsonl_file.parent.parent.name
+
+        if entry is None or entry["inode"] != st.st_ino or st.st_size < entry["offset"]:
+            # 新文件，或文件被替换/截断：从头重新统计
+            self._drop_session(key)
+            entry = {"inode": st.st_ino, "offset": 0, "agent": agent, "session_id": jsonl_file.stem}
+            self.files[key] = entry
+
+        with open(jsonl_file, "rb") as f:
+            f.seek(entry["offset"])
+            chunk = f.read(st.st_size - entry["offset"])
+        self.bytes_ingested += len(chunk)
+
+        # 只消费完整的行，写了一半的行留到下次
+        end = chunk.rfind(b"\n") + 1
+        entry["offset"] += end
+        if not end:
+            return False
+
+        delta = empty_totals()
+        hourly = {}
+        last_model = None
+        last_timestamp = None
+        for line in chunk[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json_codec.loads(line)
+            except json.JSONDecodeError:
+                continue
+            # 检查 message 类型的记录
+            if record.get("type") != "message":
+                continue
+            msg = record.get("message", {})
+            if msg.get("role") != "assistant" or "usage" not in msg:
+                continue
+            usage = msg["usage"]
+            delta["input_tokens"] += usage.get("input", 0)
+            delta["output_tokens"] += usage.get("output", 0)
+            if "cost" in usage and isinstance(usage["cost"], dict):
+                delta["cost"] += usage["cost"].get("total", 0)
+            delta["requests"] += 1
+            last_model = msg.get("model", "")
+            if "timestamp" in record:
+                last_timestamp = record["timestamp"]
+                ts = parse_timestamp(record["timestamp"])
+                if ts is not None:
+                    cost = usage["cost"].get("total", 0) if isinstance(usage.get("cost"), dict) else 0
+                    hour = int(ts // 3600 * 3600)
+                    add_bucket(hourly, f"{last_model}\t{hour}",
+                               (usage.get("input", 0), usage.get("output", 0), cost, 1))
+
+        if not delta["requests"]:
+            return False
+        delta["total_tokens"] = delta["input_tokens"] + delta["output_tokens"]
+
+        session = self.sessions.get(key)
+        if session is None:
+            session = {"session_id": entry["session_id"], "agent": agent, **empty_totals(),
+                       "model": "", "last_activity": None}
+            self.sessions[key] = session
+            self._agent(agent)["sessions"] += 1
+        for field, value in delta.items():
+            session[field] += value
+            self._agent(agent)[field] += value
+        session["model"] = last_model
+        if last_timestamp is not None:
+            session["last_activity"] = last_timestamp
+
+        contributions = self.session_buckets.setdefault(key, {})
+        for bucket_key, values in hourly.items():
+            add_bucket(contributions, bucket_key, values)
+            self._add_series(agent, bucket_key, values)
+        return True
+
+    def _add_series(self, agent: str, bucket_key: str, values, sign: int = 1):
+        """把一个小时桶的贡献计入所有粒度的时间序列"""
+        model, hour = bucket_key.rsplit("\t", 1)
+        series_key = f"{agent}\t{model}"
+        for granularity, seconds in GRANULARITIES.items():
+            buckets = self.series[granularity].setdefault(series_key, {})
+            add_bucket(buckets, str(int(hour) // seconds * seconds), values, sign)
+            if not buckets:
+                del self.series[granularity][series_key]
+
+    def _agent(self, agent: str) -> dict:
+        if agent not in self.agents:
+            self.agents[agent] = {**empty_totals(), "sessions": 0}
+        return self.agents[agent]
+
+    def _drop_session(self, key: str):
+        """从 agent 聚合中扣除某个 session 的贡献"""
+        session = self.sessions.pop(key, None)
+        if session is None:
+            return
+        for bucket_key, values in self.session_buckets.pop(key, {}).items():
+            self._add_series(session["agent"], bucket_key, values, sign=-1)
+        agent = self._agent(session["agent"])
+        for field in empty_totals():
+            agent[field] -= session[field]
+        agent["sessions"] -= 1
+        if agent["sessions"] <= 0:
+            del self.agents[session["agent"]]
+
+    # ----------------------------------------
+    # 读取
+    # ----------------------------------------
+
+    def usage(self) -> dict:
+        """返回 /usage 的 summary / by_agent / sessions 部分（预先计算，变化后才重建）"""
+        payload = self._payload
+        if payload is not None:
+            return payload
+        with self.lock:
+            if self._payload is None:
+                self._payload = self._build_payload()
+            return self._payload
+
+    def _build_payload(self) -> dict:
+        totals = empty_totals()
+        for agent in self.agents.values():
+            for field in totals:
+                totals[field] += agent[field]
+
+        agents_list = [{"name": name, **values} for name, values in self.agents.items()]
+        agents_list.sort(key=lambda x: x["total_tokens"], reverse=True)
+
+        sessions = sorted(self.sessions.values(), key=lambda x: x["total_tokens"], reverse=True)
+
+        return {
+            "summary": {
+                "total_input_tokens": totals["input_tokens"],
+                "total_output_tokens": totals["output_tokens"],
+                "total_tokens": totals["total_tokens"],
+                "total_requests": totals["requests"],
+                "total_cost": totals["cost"],
+                "session_count": len(self.sessions),
+                "agent_count": len(self.agents),
+            },
+            "by_agent": agents_list,
+            "sessions": sessions[:TOP_SESSIONS],
+        }
+
+    def usage_series(self, granularity: str, start: float, end: float, agent: str = None) -> dict:
+        """返回 [start, end) 区间内按 agent + model 拆分的时间序列
+
+        只遍历预聚合的桶，不读取 transcript。区间会对齐到桶边界。
+        """
+        seconds = GRANULARITIES[granularity]
+        first = int(start // seconds * seconds)
+        count = max(0, -(-int(end - first) // seconds))
+        if count > MAX_BUCKETS:
+            raise ValueError(f"区间过大：最多 {MAX_BUCKETS} 个 {granularity} 桶")
+        keys = [str(first + i * seconds) for i in range(count)]
+
+        series = []
+        totals = {field: [0] * count for field in BUCKET_FIELDS}
+        with self.lock:
+            items = list(self.series[granularity].items())
+        for series_key, buckets in sorted(items):
+            series_agent, model = series_key.split("\t", 1)
+            if agent and series_agent != agent:
+                continue
+            columns = {field: [0] * count for field in BUCKET_FIELDS}
+            hit = False
+            for i, key in enumerate(keys):
+                values = buckets.get(key)
+                if values is None:
+                    continue
+                hit = True
+                for field, value in zip(BUCKET_FIELDS, values):
+                    columns[field][i] = value
+                    totals[field][i] += value
+            if hit:
+                series.append({"agent": series_agent, "model": model, **columns})
+
+        return {
+            "granularity": granularity,
+            "from": datetime.fromtimestamp(first, tz=timezone.utc).isoformat(),
+            "to": datetime.fromtimestamp(first + count * seconds, tz=timezone.utc).isoformat(),
+            "buckets": [datetime.fromtimestamp(int(k), tz=timezone.utc).isoformat() for k in keys],
+            "series": series,
+            "totals": totals,
+        }
+
+    # ----------------------------------------
+    # 后台线程
+    # ----------------------------------------
+
+    def ensure_started(self):
+        """首次调用时加载状态、同步采集一次并启动后台线程"""
+        if self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is not None:
+                return
+            self.load_state()
+            if self.ingest_once():
+                self.save_state()
+            # 进程正常退出（包括 API 服务收到 SIGTERM / Ctrl-C 关闭）时写入尚未保存的变化
+            atexit.register(self.flush)
+            self._thread = threading.Thread(target=self._run, name="usage-ingest", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                with self.lock:
+                    if self.ingest_once():
+                        self.dirty = True
+                    self.maybe_save()
+            except Exception:
+                continue
+
+
+if __name__ == "__main__":
+    ingester = UsageIngester()
+    ingester.load_state()
+    started = time.time()
+    changed = ingester.ingest_once()
+    if changed:
+        ingester.save_state()
+    summary = ingester.usage()["summary"]
+    print(f"✅ 采集完成 ({time.time() - started:.2f}s, {'有更新' if changed else '无变化'})")
+    print(f"   sessions: {summary['session_count']}, agents: {summary['agent_count']}, tokens: {summary['total_tokens']}")
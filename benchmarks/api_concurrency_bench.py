@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+API 并发基准：/issues/api/usage 的重计算是否拖慢 /issues/api/issues
+
+在临时 HOME 下生成合成 .issues/ 和 transcript，启动 api-server，分两个阶段测量:
+1. baseline: 只有 /issues/api/issues 和 /issues/api/issues/{id} 的并发请求
+2. contended: 同时有客户端不断请求 /issues/api/usage（首次为冷采集）和全量 /usage/series
+
+输出两阶段各自的吞吐和 p50/p95/p99（JSON）。
+
+用法:
+  python3 benchmarks/api_concurrency_bench.py [--issues 2000] [--sessions 200] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+from common import (
+    ROOT_DIR,
+    build_issues_tree,
+    build_transcripts,
+    free_port,
+    python_command,
+    run_clients,
+    start_server,
+    stop_server,
+)
+
+HOST = "127.0.0.1"
+HEAVY_PATHS = [
+    "/issues/api/usage",
+    "/issues/api/usage/series?granularity=hour&from=2026-01-01T00:00:00Z&to=2026-03-01T00:00:00Z",
+    "/issues/api/usage/series?granularity=day&from=2026-01-01T00:00:00Z&to=2026-03-01T00:00:00Z",
+]
+
+
+def issue_paths(count: int):
+    def pick(rng):
+        if rng.random() < 0.5:
+            return "/issues/api/issues"
+        return f"/issues/api/issues/{rng.randint(1, count)}"
+    return pick
+
+
+async def measure(port: int, args) -> dict:
+    baseline = await run_clients(HOST, port, issue_paths(args.issues), args.concurrency, args.duration)
+
+    issues_task = run_clients(HOST, port, issue_paths(args.issues), args.concurrency, args.duration)
+    heavy_task = run_clients(HOST, port, HEAVY_PATHS, args.heavy_concurrency, args.duration)
+    contended, heavy = await asyncio.gather(issues_task, heavy_task)
+
+    return {"baseline": baseline, "contended": contended, "heavy": heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 并发基准")
+    parser.add_argument("--issues", type=int, default=2000, help="合成 Issue 数量")
+    parser.add_argument("--progress", type=int, default=20000, help="合成进度记录行数")
+    parser.add_argument("--sessions", type=int, default=200, help="合成 transcript 数量")
+    parser.add_argument("--lines", type=int, default=1000, help="每个 transcript 的行数")
+    parser.add_argument("--concurrency", type=int, default=16, help="/issues 客户端数")
+    parser.add_argument("--heavy-concurrency", type=int, default=4, help="/usage 客户端数")
+    parser.add_argument("--duration", type=float, default=10.0, help="每个阶段持续秒数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        workspace = home / ".openclaw/shared/async-issue-manager"
+        dataset = build_issues_tree(workspace, args.issues, args.progress)
+        dataset["transcript_lines"] = build_transcripts(home / ".openclaw/agents", args.sessions, args.lines)
+
+        port = free_port()
+        proc = start_server(
+            python_command("-m", "uvicorn", "api:app", "--host", HOST, "--port", str(port), "--log-level", "warning"),
+            cwd=ROOT_DIR / "api-server",
+            env={"HOME": str(home)},
+            port=port,
+            health_path="/issues/api/stats",
+        )
+        try:
+            results = asyncio.run(measure(port, args))
+        finally:
+            stop_server(proc)
+
+    results["dataset"] = dataset
+    results["p99_ratio"] = round(
+        results["contended"]["p99_ms"] / results["baseline"]["p99_ms"], 2
+    ) if results["baseline"]["p99_ms"] else None
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+基准测试公共工具
+- 合成 .issues/ 目录（index.json、Markdown、progress.jsonl、交付物索引）
+- 合成 session transcript
+- 本地启动 API 服务器子进程
+- 极简 asyncio HTTP 客户端和延迟分位数统计
+
+只依赖标准库。
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+AGENTS = ["dev", "hunter", "debugger", "writer", "ops"]
+LABELS = ["bug", "learning", "automation", "architecture", "memory", "研究", "部署", "优化"]
+STATUSES = ["open", "in-progress", "closed"]
+MODELS = ["claude-sonnet", "claude-opus", "gpt-5"]
+
+
+# ========================================
+# 合成数据
+# ========================================
+
+def build_issues_tree(workspace: Path, issues: int = 1000, progress_lines: int = 10000, seed: int = 42) -> dict:
+    """在 workspace/.issues 下生成与 manager.py 格式一致的合成数据，返回数量统计"""
+    rng = random.Random(seed)
+    issues_dir = workspace / ".issues"
+    for status in STATUSES:
+        (issues_dir / status).mkdir(parents=True, exist_ok=True)
+    (issues_dir / "deliverables").mkdir(parents=True, exist_ok=True)
+
+    index = {"next_id": issues + 1, "issues": []}
+    deliverables = []
+    for issue_id in range(1, issues + 1):
+        status = rng.choice(STATUSES)
+        labels = rng.sample(LABELS, rng.randint(1, 3))
+        assignee = rng.choice(AGENTS)
+        created = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00"
+        title = f"合成任务 {issue_id} " + " ".join(labels)
+        rel = f".issues/{status}/{issue_id:03d}-synthetic-{issue_id}.md"
+        entry = {
+            "id": issue_id,
+            "title": title,
+            "priority": rng.choice(["P0", "P1", "P2", "P3"]),
+            "labels": labels,
+            "status": status,
+            "assignee": assignee,
+            "created_at": created,
+            "updated_at": created,
+            "file": rel,
+        }
+        if status == "closed":
+            entry["closed_at"] = created
+            entry["resolution"] = "已完成"
+            deliverables.append({
+                "issue_id": issue_id,
+                "filename": f"report-{issue_id}.md",
+                "path": f".issues/deliverables/issue-{issue_id:03d}/report-{issue_id}.md",
+                "description": "合成交付物",
+                "added_at": created,
+                "size": "1.0 KB",
+            })
+        index["issues"].append(entry)
+
+        body = "\n\n".join(
+            f"## 章节 {n}\n" + "合成正文内容。" * rng.randint(5, 40) for n in range(rng.randint(2, 5))
+        )
+        (workspace / rel).write_text(
+            f"---\nid: {issue_id}\ntitle: {title}\npriority: {entry['priority']}\n"
+            f"labels: {', '.join(labels)}\nstatus: {status}\nassignee: {assignee}\n"
+            f"created_at: {created}\nupdated_at: {created}\n---\n\n{body}\n",
+            encoding="utf-8",
+        )
+
+    (issues_dir / "index.json").write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    (issues_dir / "deliverables" / "index.json").write_text(
+        json.dumps({"deliverables": deliverables}, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    with open(issues_dir / "progress.jsonl", "w", encoding="utf-8") as f:
+        for n in range(progress_lines):
+            f.write(json.dumps({
+                "issue_id": rng.randint(1, issues),
+                "timestamp": f"2026-02-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{n % 60:02d}:00",
+                "progress": f"合成进度 {n}",
+                "status": "in-progress",
+                "agent": rng.choice(AGENTS),
+            }, ensure_ascii=False) + "\n")
+
+    return {"issues": issues, "progress_lines": progress_lines, "deliverables": len(deliverables)}
+
+
+def build_transcripts(agents_dir: Path, sessions: int = 100, lines: int = 500, seed: int = 42) -> int:
+    """在 agents_dir/<agent>/sessions/ 下生成合成 transcript，返回总行数"""
+    rng = random.Random(seed)
+    total = 0
+    for n in range(sessions):
+        agent = AGENTS[n % len(AGENTS)]
+        sessions_dir = agents_dir / agent / "sessions"
+        sessions_dir.mkdir(parents=True, exist_ok=True)
+        with open(sessions_dir / f"session-{n:05d}.jsonl", "w", encoding="utf-8") as f:
+            for i in range(lines):
+                f.write(json.dumps({
+                    "type": "message",
+                    "timestamp": f"2026-02-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{i % 60:02d}:00Z",
+                    "message": {
+                        "role": "assistant",
+                        "model": rng.choice(MODELS),
+                        "usage": {
+                            "input": rng.randint(100, 20000),
+                            "output": rng.randint(10, 2000),
+                            "cost": {"total": rng.random() / 10},
+                        },
+                    },
+                }) + "\n")
+                total += 1
+    return total
+
+
+# ========================================
+# 服务器进程
+# ========================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(command: list, cwd: Path, env: dict, port: int, health_path: str, timeout: float = 30):
+    """启动服务器子进程并等待健康检查通过
+
+    stderr 写入临时文件而不是管道：访问日志没人读取时管道写满会阻塞服务器。
+    """
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(command, cwd=cwd, env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=log)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"服务器启动失败: {log.read().decode(errors='replace')}")
+        try:
+            status, _ = asyncio.run(http_get("127.0.0.1", port, health_path))
+            if status == 200:
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("服务器启动超时")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ========================================
+# HTTP 客户端与统计
+# ========================================
+
+async def http_request(host: str, port: int, path: str, headers: dict = None):
+    """发送一个 GET 请求（Connection: close），返回 (status, 响应头, body 字节数)
+
+    响应头名称统一为小写。
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    if not head:
+        return 0, {}, 0
+    head_lines = head.decode("latin-1").split("\r\n")
+    status = int(head_lines[0].split(" ", 2)[1])
+    response_headers = {}
+    for line in head_lines[1:]:
+        name, _, value = line.partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    return status, response_headers, len(body)
+
+
+async def http_get(host: str, port: int, path: str, headers: dict = None):
+    """发送一个 GET 请求，返回 (status, body 字节数)"""
+    status, _, size = await http_request(host, port, path, headers)
+    return status, size
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """latencies 为秒，输出毫秒"""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round((values[-1] if values else 0) * 1000, 2),
+    }
+
+
+async def run_clients(host: str, port: int, paths, concurrency: int, duration: float,
+                      headers: dict = None) -> dict:
+    """concurrency 个客户端循环请求 paths（可为 list 或返回路径的函数），持续 duration 秒"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    pick = paths if callable(paths) else (lambda rng: rng.choice(paths))
+
+    async def client(n):
+        nonlocal errors
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _ = await http_get(host, port, pick(rng), headers)
+            except OSError:
+                errors += 1
+                continue
+            if status >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def python_command(*args) -> list:
+    return [sys.executable, *args]
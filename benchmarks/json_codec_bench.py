@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+JSON 编解码微基准
+在合成的 50k Issue 索引上比较各后端（orjson / msgspec / 标准库）的编码和解码耗时
+
+用法:
+  python3 benchmarks/json_codec_bench.py [--issues 50000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import json_codec
+
+AGENTS = ["dev", "hunter", "debugger", "writer", "ops", "unassigned"]
+LABELS = ["bug", "learning", "automation", "architecture", "memory", "研究", "部署", "优化"]
+STATUSES = ["open", "in-progress", "closed"]
+
+
+def synthetic_index(count: int, seed: int = 42) -> dict:
+    """生成与 .issues/index.json 结构一致的合成索引"""
+    rng = random.Random(seed)
+    issues = []
+    for issue_id in range(1, count + 1):
+        status = rng.choice(STATUSES)
+        created = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00"
+        issue = {
+            "id": issue_id,
+            "title": f"合成任务 #{issue_id} - " + " ".join(rng.choices(LABELS, k=4)),
+            "priority": rng.choice(["P0", "P1", "P2", "P3"]),
+            "labels": rng.sample(LABELS, rng.randint(1, 4)),
+            "status": status,
+            "assignee": rng.choice(AGENTS),
+            "created_at": created,
+            "updated_at": created,
+            "file": f".issues/{status}/{issue_id:03d}-synthetic-{issue_id}.md",
+        }
+        if status == "closed":
+            issue["closed_at"] = created
+            issue["resolution"] = "已完成并提交交付物" * rng.randint(1, 5)
+        issues.append(issue)
+    return {"next_id": count + 1, "issues": issues}
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 编解码微基准")
+    parser.add_argument("--issues", type=int, default=50000, help="合成 Issue 数量")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    index = synthetic_index(args.issues)
+    results = {"issues": args.issues, "repeat": args.repeat, "backends": {}}
+
+    for name in json_codec.available_backends():
+        codec = json_codec.set_backend(name)
+        compact = codec.dumps(index)
+        pretty = codec.dumps(index, pretty=True)
+        results["backends"][name] = {
+            "encode_ms": best_of(args.repeat, lambda: codec.dumps(index)),
+            "encode_pretty_ms": best_of(args.repeat, lambda: codec.dumps(index, pretty=True)),
+            "decode_ms": best_of(args.repeat, lambda: codec.loads(compact)),
+            "compact_bytes": len(compact),
+            "pretty_bytes": len(pretty),
+        }
+
+    baseline = results["backends"]["json"]
+    for stats in results["backends"].values():
+        stats["encode_speedup"] = round(baseline["encode_ms"] / max(stats["encode_ms"], 1e-6), 1)
+        stats["decode_speedup"] = round(baseline["decode_ms"] / max(stats["decode_ms"], 1e-6), 1)
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+HTTP 压测：在合成 .issues/ 上启动 API 服务器，按看板的真实访问比例回放请求
+
+- fastapi: api-server/api.py（uvicorn），数据位于临时 HOME 下
+- flask:   web-dashboard/api.py（Flask 开发服务器，threaded），通过 ISSUE_MANAGER_ROOT 指向合成工作区
+
+请求组合模拟看板页面：列表 / 统计 / 负责人轮询（浏览器 no-cache 重新验证，带 If-None-Match），
+打开卡片查看详情（偏向最近的 Issue），可见卡片批量预取，偶尔打开 usage 页或进度列表。
+结果按端点和总体输出吞吐、p50/p95/p99（JSON），可用 --output 保存后跨提交对比。
+
+用法:
+  python3 benchmarks/load_test.py --server fastapi --issues 10000 --progress 100000
+  python3 benchmarks/load_test.py --server flask --issues 1000 --duration 20 --output flask-1k.json
+  python3 benchmarks/load_test.py --issues 100000 --progress 1000000 --corpus /tmp/corpus-100k
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from common import (
+    ROOT_DIR,
+    build_issues_tree,
+    build_transcripts,
+    free_port,
+    http_request,
+    python_command,
+    start_server,
+    stop_server,
+    summarize,
+)
+
+HOST = "127.0.0.1"
+BATCH_SIZE = 24
+
+# (名称, 权重)；路径由 make_path 生成
+MIXES = {
+    "fastapi": [
+        ("list", 30),
+        ("stats", 15),
+        ("agents", 15),
+        ("detail", 25),
+        ("batch", 10),
+        ("usage", 5),
+    ],
+    "flask": [
+        ("list", 30),
+        ("stats", 15),
+        ("agents", 15),
+        ("detail", 25),
+        ("batch", 10),
+        ("progress", 5),
+    ],
+}
+
+PREFIXES = {"fastapi": "/issues/api", "flask": "/api"}
+
+
+def pick_issue(rng: random.Random, count: int) -> int:
+    """看板按 ID 倒序展示，越新的 Issue 越常被打开"""
+    offset = min(count - 1, int(rng.expovariate(1 / max(1, count * 0.05))))
+    return count - offset
+
+
+def make_path(server: str, kind: str, rng: random.Random, count: int) -> str:
+    prefix = PREFIXES[server]
+    if kind == "list":
+        return f"{prefix}/issues"
+    if kind == "stats":
+        return f"{prefix}/stats"
+    if kind == "agents":
+        return f"{prefix}/agents"
+    if kind == "detail":
+        return f"{prefix}/issues/{pick_issue(rng, count)}"
+    if kind == "batch":
+        start = pick_issue(rng, count)
+        ids = range(start, max(0, start - BATCH_SIZE), -1)
+        return f"{prefix}/issues:batch?ids={','.join(map(str, ids))}"
+    if kind == "usage":
+        return f"{prefix}/usage"
+    if kind == "progress":
+        return f"{prefix}/progress?limit=100"
+    raise ValueError(kind)
+
+
+def server_command(server: str, port: int, workspace: Path, home: Path):
+    """返回 (command, cwd, env, 健康检查路径)"""
+    if server == "fastapi":
+        command = python_command("-m", "uvicorn", "api:app", "--host", HOST, "--port", str(port),
+                                 "--log-level", "warning")
+        return command, ROOT_DIR / "api-server", {"HOME": str(home)}, "/health"
+    command = python_command("-m", "flask", "--app", "api", "run", "--host", HOST, "--port", str(port),
+                             "--with-threads")
+    return command, ROOT_DIR / "web-dashboard", {"ISSUE_MANAGER_ROOT": str(workspace)}, "/api/health"
+
+
+async def run_mix(server: str, port: int, count: int, args) -> dict:
+    """concurrency 个客户端按权重回放请求；每个客户端维护自己的 ETag 缓存"""
+    mix = MIXES[server]
+    kinds = [kind for kind, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    not_modified = {kind: 0 for kind in kinds}
+    transferred = {kind: 0 for kind in kinds}
+
+    async def client(n: int, deadline: float, record: bool):
+        rng = random.Random(args.seed * 1000 + n)
+        etags = {}
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            path = make_path(server, kind, rng, count)
+            headers = {"Accept-Encoding": "gzip, br"}
+            if path in etags and rng.random() < args.revalidate:
+                headers["If-None-Match"] = etags[path]
+            started = time.perf_counter()
+            try:
+                status, response_headers, size = await http_request(HOST, port, path, headers)
+            except OSError:
+                if record:
+                    errors[kind] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            if "etag" in response_headers:
+                etags[path] = response_headers["etag"]
+            if not record:
+                continue
+            if status >= 400 or status == 0:
+                errors[kind] += 1
+                continue
+            if status == 304:
+                not_modified[kind] += 1
+            latencies[kind].append(elapsed)
+            transferred[kind] += size
+
+    if args.warmup > 0:
+        deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*(client(n, deadline, False) for n in range(args.concurrency)))
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(client(n, deadline, True) for n in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for kind in kinds:
+        endpoints[kind] = {
+            **summarize(latencies[kind], errors[kind], elapsed),
+            "not_modified": not_modified[kind],
+            "bytes": transferred[kind],
+        }
+    all_latencies = [value for values in latencies.values() for value in values]
+    overall = summarize(all_latencies, sum(errors.values()), elapsed)
+    overall["not_modified"] = sum(not_modified.values())
+    overall["bytes"] = sum(transferred.values())
+    return {"overall": overall, "endpoints": endpoints}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def prepare_corpus(base: Path, args) -> dict:
+    """生成（或复用）合成数据；fastapi 使用 base 作为 HOME"""
+    workspace = base / ".openclaw/shared/async-issue-manager"
+    marker = base / "corpus.json"
+    wanted = {"issues": args.issues, "progress": args.progress, "sessions": args.sessions, "seed": args.seed}
+    if marker.exists():
+        info = json.loads(marker.read_text())
+        if info.get("params") == wanted:
+            return info["dataset"]
+
+    started = time.perf_counter()
+    dataset = build_issues_tree(workspace, args.issues, args.progress, args.seed)
+    dataset["transcript_lines"] = build_transcripts(base / ".openclaw/agents", args.sessions, 200, args.seed)
+    dataset["build_seconds"] = round(time.perf_counter() - started, 2)
+    marker.write_text(json.dumps({"params": wanted, "dataset": dataset}))
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 服务器压测")
+    parser.add_argument("--server", choices=sorted(MIXES), default="fastapi")
+    parser.add_argument("--issues", type=int, default=1000, help="合成 Issue 数量")
+    parser.add_argument("--progress", type=int, default=10000, help="合成进度记录行数")
+    parser.add_argument("--sessions", type=int, default=50, help="合成 transcript 数量（/usage）")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=15.0, help="测量时长（秒）")
+    parser.add_argument("--warmup", type=float, default=3.0, help="预热时长（秒，不计入结果）")
+    parser.add_argument("--revalidate", type=float, default=0.7,
+                        help="已有 ETag 时带 If-None-Match 的比例（模拟浏览器重新验证）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus", help="合成数据目录（保留并在参数相同时复用，适合 100k 规模）")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    temp = None
+    if args.corpus:
+        base = Path(args.corpus)
+        base.mkdir(parents=True, exist_ok=True)
+    else:
+        temp = tempfile.TemporaryDirectory()
+        base = Path(temp.name)
+
+    try:
+        dataset = prepare_corpus(base, args)
+        workspace = base / ".openclaw/shared/async-issue-manager"
+        port = free_port()
+        command, cwd, env, health = server_command(args.server, port, workspace, base)
+        proc = start_server(command, cwd, env, port, health, timeout=120)
+        try:
+            results = asyncio.run(run_mix(args.server, port, args.issues, args))
+        finally:
+            stop_server(proc)
+    finally:
+        if temp is not None:
+            temp.cleanup()
+
+    report = {
+        "server": args.server,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "dataset": dataset,
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "revalidate": args.revalidate,
+            "mix": dict(MIXES[args.server]),
+        },
+        **results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
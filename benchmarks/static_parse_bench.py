@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+静态数据生成器并行解析基准
+在合成的 50k Issue 工作区上以不同 --jobs 冷启动（无解析缓存）运行 collect_all_issues，
+输出耗时、吞吐和相对 jobs=1 的加速比，并校验各 jobs 的结果完全一致。
+
+生成器通过 ISSUE_MANAGER_ROOT 指向合成工作区，不会读写仓库内的 data/。
+加速比受 CPU 核数限制（jobs 超过核数时不会再提升），结果中附带 cpu_count。
+
+用法:
+  python3 benchmarks/static_parse_bench.py [--issues 50000] [--jobs 1,2,4,8] [--repeat 3]
+  python3 benchmarks/static_parse_bench.py --corpus /tmp/corpus-50k   # 保留并复用合成数据
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT_DIR, build_issues_tree
+
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+sys.path.insert(0, str(ROOT_DIR / "web-dashboard"))
+
+import json_codec
+
+
+def prepare_corpus(base: Path, issues: int, seed: int) -> Path:
+    """生成（或复用）合成工作区，返回工作区根目录"""
+    workspace = base / "workspace"
+    marker = base / "corpus.json"
+    wanted = {"issues": issues, "seed": seed}
+    if marker.exists() and json.loads(marker.read_text()) == wanted:
+        return workspace
+    build_issues_tree(workspace, issues, 0, seed)
+    marker.write_text(json.dumps(wanted))
+    return workspace
+
+
+def run(generator, jobs: int, repeat: int):
+    """返回 (最佳耗时秒, 结果摘要)；每次都用空的解析缓存"""
+    best = float("inf")
+    digest = None
+    for _ in range(repeat):
+        counters = {}
+        started = time.perf_counter()
+        issues = generator.collect_all_issues({}, {}, counters, jobs=jobs)
+        best = min(best, time.perf_counter() - started)
+        digest = hashlib.sha1(json_codec.dumps_bytes(issues)).hexdigest()
+    return best, digest, counters["parsed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="静态生成器并行解析基准")
+    parser.add_argument("--issues", type=int, default=50000, help="合成 Issue 数量")
+    parser.add_argument("--jobs", default="1,2,4,8", help="逗号分隔的进程数列表")
+    parser.add_argument("--repeat", type=int, default=3, help="每个 jobs 取最好的一次")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus", help="合成数据目录（保留并在参数相同时复用）")
+    args = parser.parse_args()
+
+    temp = None
+    if args.corpus:
+        base = Path(args.corpus)
+        base.mkdir(parents=True, exist_ok=True)
+    else:
+        temp = tempfile.TemporaryDirectory()
+        base = Path(temp.name)
+
+    try:
+        started = time.perf_counter()
+        workspace = prepare_corpus(base, args.issues, args.seed)
+        build_seconds = time.perf_counter() - started
+
+        # 生成器在导入时读取 ISSUE_MANAGER_ROOT；进程池的子进程继承同一环境
+        os.environ["ISSUE_MANAGER_ROOT"] = str(workspace)
+        generator = importlib.import_module("generate_static_data")
+
+        results = []
+        baseline = None
+        reference = None
+        for jobs in [int(value) for value in args.jobs.split(",")]:
+            seconds, digest, parsed = run(generator, jobs, args.repeat)
+            baseline = baseline or seconds
+            reference = reference or digest
+            results.append({
+                "jobs": jobs,
+                "seconds": round(seconds, 3),
+                "files_per_second": round(parsed / seconds),
+                "speedup": round(baseline / seconds, 2),
+                "efficiency": round(baseline / seconds / jobs, 2),
+                "identical": digest == reference,
+            })
+    finally:
+        if temp is not None:
+            temp.cleanup()
+
+    report = {
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "issues": args.issues,
+        "build_seconds": round(build_seconds, 2),
+        "results": results,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if not all(result["identical"] for result in results):
+        sys.exit("❌ 不同 jobs 的解析结果不一致")
+
+
+if __name__ == "__main__":
+    main()
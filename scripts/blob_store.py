@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+按内容寻址的交付物存储
+
+- 对象: .issues/deliverables/.objects/<sha256 前 2 位>/<其余 62 位>，只读，内容相同的文件只存一份；
+  可执行文件存为 <其余 62 位>.x（权限 0555，其余 0444），链接出来的文件保留可执行位
+- 清单: .issues/deliverables/manifests/issue-NNN.json，记录 Issue 目录内每个文件的 sha256 和大小
+- 浏览路径: .issues/deliverables/issue-NNN/<文件> 是对象的硬链接（不支持时退回 reflink，再退回复制），
+  保持原有目录结构，看板、脚本按原路径读取即可
+
+对象和浏览路径共用 inode，权限为只读（保留可执行位）：原地修改会同时改坏其他 Issue 的同一份内容，
+需要更新时重新 deliverable.py add。对象目录不提交到 git（git 自身已按内容去重），
+clone 之后用 deliverable.py dedup 重建。
+
+清单格式:
+  {"issue_id": 1, "files": {"scripts/a.py": {"sha256": "...", "size": 123, "mtime_ns": 源文件 mtime,
+                                               "inode": ..., "inode_mtime_ns": ..., "executable": true}}}
+  mtime_ns 供 deliverable.py add --sync 判断源文件是否变化；inode / inode_mtime_ns 是写入时 Issue 目录中
+  文件的身份（只在本机有效），API 只在两者仍一致时才把 sha256 当作 ETag；
+  executable 只在可执行文件上出现，与 sha256 一起确定对象
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Linux FICLONE ioctl（btrfs / xfs 等支持 reflink 的文件系统）
+FICLONE = 0x40049409
+
+CHUNK_SIZE = 1024 * 1024
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+EXECUTABLE = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+# 可执行对象的文件名后缀（内容相同、可执行位不同的文件各存一份）
+EXECUTABLE_SUFFIX = ".x"
+
+
+def is_executable(mode: int) -> bool:
+    return bool(mode & stat.S_IXUSR)
+
+
+def object_mode(executable: bool) -> int:
+    """对象和复制出来的浏览路径的权限：只读，保留可执行位"""
+    return READ_ONLY | (EXECUTABLE if executable else 0)
+
+
+def hash_file(path: Path):
+    """流式计算 sha256，返回 (digest, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def temp_name(name: str) -> str:
+    """同目录下的临时文件名（进程和线程各不相同，可以并发写入同一对象）"""
+    return f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def reflink(source: Path, dest: Path):
+    """写时复制克隆（不支持时抛出 OSError）"""
+    if fcntl is None:
+        raise OSError("reflink 不可用")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            dest.unlink()
+            raise
+
+
+class BlobStore:
+    """内容寻址的只读对象目录，对象由 (digest, 是否可执行) 确定"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._repair_lock = threading.Lock()
+
+    def path(self, digest: str, executable: bool = False) -> Path:
+        return self.root / digest[:2] / (digest[2:] + (EXECUTABLE_SUFFIX if executable else ""))
+
+    def has(self, digest: str, executable: bool = False) -> bool:
+        return self.path(digest, executable).is_file()
+
+    def put(self, source: Path, digest: str = None, executable: bool = None, verify: bool = False) -> str:
+        """把文件存入对象目录，返回 digest；executable 默认取源文件的可执行位
+
+        对象已存在时不复制；但大小与源文件不同，或 verify=True 时重新哈希，内容不符就用源文件修复
+        """
+        if digest is None:
+            digest, _ = hash_file(source)
+        if executable is None:
+            executable = is_executable(os.stat(source).st_mode)
+        target = self.path(digest, executable)
+        if target.exists():
+            if ((verify or target.stat().st_size != os.stat(source).st_size)
+                    and hash_file(target)[0] != digest):
+                self.repair(source, digest, executable)
+            return digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(temp_name(target.name))
+        shutil.copyfile(source, tmp)
+        os.chmod(tmp, object_mode(executable))
+        os.replace(tmp, target)
+        return digest
+
+    def repair(self, source: Path, digest: str, executable: bool = False):
+        """对象被原地改写时用 source（内容为 digest）写回同一个 inode，链接到它的所有 Issue 文件一起恢复"""
+        target = self.path(digest, executable)
+        mode = object_mode(executable)
+        with self._repair_lock:
+            os.chmod(target, mode | stat.S_IWUSR)
+            try:
+                with open(source, "rb") as src, open(target, "r+b") as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                    dst.truncate()
+            finally:
+                os.chmod(target, mode)
+
+    def is_linked(self, digest: str, dest: Path, executable: bool = False) -> bool:
+        """dest 是否就是该对象（同一 inode）"""
+        try:
+            return os.path.samefile(self.path(digest, executable), dest)
+        except OSError:
+            return False
+
+    def materialize(self, digest: str, dest: Path, executable: bool = False) -> str:
+        """在 dest 放置对象内容，返回方式: "linked" / "reflinked" / "copied" / "unchanged" """
+        if self.is_linked(digest, dest, executable):
+            return "unchanged"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(temp_name(dest.name))
+        source = self.path(digest, executable)
+        try:
+            os.link(source, tmp)
+            method = "linked"
+        except OSError:
+            try:
+                reflink(source, tmp)
+                method = "reflinked"
+            except OSError:
+                shutil.copyfile(source, tmp)
+                method = "copied"
+            os.chmod(tmp, object_mode(executable))
+        if dest.is_dir() and not dest.is_symlink():
+            shutil.rmtree(dest)
+        os.replace(tmp, dest)
+        return method
+
+    def keys(self):
+        """对象目录中的全部 (digest, 是否可执行)"""
+        if not self.root.exists():
+            return
+        for prefix in self.root.iterdir():
+            if not prefix.is_dir() or len(prefix.name) != 2:
+                continue
+            for blob in prefix.iterdir():
+                if blob.name.startswith("."):
+                    continue
+                name = blob.name
+                executable = name.endswith(EXECUTABLE_SUFFIX)
+                if executable:
+                    name = name[:-len(EXECUTABLE_SUFFIX)]
+                yield prefix.name + name, executable
+
+    def remove(self, digest: str, executable: bool = False) -> int:
+        """删除对象，返回释放的字节数"""
+        target = self.path(digest, executable)
+        try:
+            size = target.stat().st_size
+            os.chmod(target, READ_ONLY | stat.S_IWUSR)
+            target.unlink()
+        except OSError:
+            return 0
+        return size
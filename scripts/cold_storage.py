@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+已关闭 Issue 交付物的冷存储归档
+
+deliverable.py archive 把 issue-NNN/ 整个目录打成一个 zip，删除原目录并回收对象存储中不再引用的内容：
+- 归档: .issues/deliverables/archive/issue-NNN.zip（标准 zip，也可以直接用 unzip 解开）
+- 索引: .issues/deliverables/archive/issue-NNN.json
+
+索引格式:
+  {
+    "issue_id": 1,
+    "archive": "issue-NNN.zip",
+    "archived_at": "...",
+    "bytes": 归档文件大小,
+    "members": {Issue 目录内相对路径: {"offset": 压缩数据在归档中的起始偏移, "compressed": 压缩后字节数,
+                                      "size": 原始字节数, "method": 0 存储 / 8 deflate,
+                                      "crc32": ..., "sha256": ...}}
+  }
+列出文件只读索引；读取单个文件时 seek 到 offset，只解压这一个成员，不需要解开整个归档，
+也不需要解析 zip 的中央目录。
+"""
+
+import hashlib
+import os
+import struct
+import zipfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+import json_codec
+from blob_store import CHUNK_SIZE, temp_name
+
+# 本身已经压缩过的格式直接存储，不再 deflate
+STORED_SUFFIXES = {
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".br",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".mov", ".webm", ".pdf",
+}
+
+# zip 本地文件头: 固定 30 字节，文件名长度和扩展字段长度在末尾
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def archive_path(archive_dir: Path, issue_id: int) -> Path:
+    return Path(archive_dir) / f"issue-{issue_id:03d}.zip"
+
+
+def index_path(archive_dir: Path, issue_id: int) -> Path:
+    return Path(archive_dir) / f"issue-{issue_id:03d}.json"
+
+
+def load_index(archive_dir: Path, issue_id: int):
+    """归档索引，未归档时为 None"""
+    path = index_path(archive_dir, issue_id)
+    if not path.exists():
+        return None
+    return json_codec.load_file(path)
+
+
+def write_archive(issue_id: int, source_dir: Path, files, archive_dir: Path) -> dict:
+    """把 [(源文件, 相对路径)] 写成归档和索引，返回索引
+
+    写入时顺带计算 sha256；写完后按索引逐个读回校验，校验通过才落盘，
+    调用方可以放心删除源文件。
+    """
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_path(archive_dir, issue_id)
+    tmp = target.with_name(temp_name(target.name))
+
+    digests = {}
+    try:
+        with zipfile.ZipFile(tmp, "w", allowZip64=True) as zf:
+            for path, rel in files:
+                info = zipfile.ZipInfo.from_file(path, rel)
+                info.compress_type = (zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES
+                                      else zipfile.ZIP_DEFLATED)
+                digest = hashlib.sha256()
+                with open(path, "rb") as src, zf.open(info, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+                    while True:
+                        chunk = src.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        dst.write(chunk)
+                digests[rel] = digest.hexdigest()
+
+        members = {}
+        with zipfile.ZipFile(tmp) as zf, open(tmp, "rb") as f:
+            for info in zf.infolist():
+                members[info.filename] = {
+                    "offset": data_offset(f, info.header_offset),
+                    "compressed": info.compress_size,
+                    "size": info.file_size,
+                    "method": info.compress_type,
+                    "crc32": info.CRC,
+                    "sha256": digests[info.filename],
+                }
+
+        for rel, member in members.items():
+            digest = hashlib.sha256()
+            for chunk in iter_member(tmp, member):
+                digest.update(chunk)
+            if digest.hexdigest() != member["sha256"]:
+                raise IOError(f"归档校验失败: {rel}")
+
+        os.replace(tmp, target)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+    index = {
+        "issue_id": issue_id,
+        "archive": target.name,
+        "archived_at": datetime.now().isoformat(),
+        "bytes": target.stat().st_size,
+        "members": dict(sorted(members.items())),
+    }
+    json_codec.dump_file(index, index_path(archive_dir, issue_id), pretty=True)
+    return index
+
+
+def data_offset(f, header_offset: int) -> int:
+    """从本地文件头算出成员压缩数据的起始偏移"""
+    f.seek(header_offset)
+    header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise IOError(f"无效的 zip 本地文件头: {header_offset}")
+    name_length, extra_length = header[-2], header[-1]
+    return header_offset + LOCAL_HEADER.size + name_length + extra_length
+
+
+def iter_member(archive: Path, member: dict, start: int = 0, end: int = None, chunk_size: int = CHUNK_SIZE):
+    """按块读取成员原始内容的 [start, end) 区间（end 为 None 表示到结尾）
+
+    存储的成员直接 seek；deflate 的成员从头流式解压，丢弃 start 之前的部分，读够 end 即停止。
+    """
+    size = member["size"]
+    end = size if end is None else min(end, size)
+    if start >= end:
+        return
+    with open(archive, "rb") as f:
+        if member["method"] == zipfile.ZIP_STORED:
+            f.seek(member["offset"] + start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise IOError(f"归档被截断: {archive}")
+                remaining -= len(chunk)
+                yield chunk
+            return
+
+        if member["method"] != zipfile.ZIP_DEFLATED:
+            raise IOError(f"不支持的压缩方式: {member['method']}")
+        f.seek(member["offset"])
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        compressed = member["compressed"]
+        position = 0
+        while compressed > 0 and position < end:
+            data = f.read(min(chunk_size, compressed))
+            if not data:
+                raise IOError(f"归档被截断: {archive}")
+            compressed -= len(data)
+            while data and position < end:
+                chunk = decompressor.decompress(data, chunk_size)
+                data = decompressor.unconsumed_tail
+                chunk_start, position = position, position + len(chunk)
+                if position <= start:
+                    continue
+                yield chunk[max(0, start - chunk_start):len(chunk) - max(0, position - end)]
+
+
+def extract_member(archive: Path, member: dict, dest: Path):
+    """把成员解压到 dest，并校验 sha256"""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(temp_name(dest.name))
+    digest = hashlib.sha256()
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in iter_member(archive, member):
+                digest.update(chunk)
+                f.write(chunk)
+        if digest.hexdigest() != member["sha256"]:
+            raise IOError(f"归档内容校验失败: {dest.name}")
+        os.replace(tmp, dest)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
@@ -3,18 +3,43 @@
 交付物管理工具
 确保每个 Issue 关闭时都有明确的交付物存放在 .issues/deliverables/ 目录
 
+文件按内容寻址存储（见 blob_store.py）：相同内容只占一份磁盘，
+issue-NNN/ 下的浏览路径是对象的硬链接；重复添加未变化的文件不做任何事。
+
 用法:
   python3 deliverable.py add <issue_id> --file <path> [--description "说明"]
+  python3 deliverable.py add <issue_id> --file <dir> --sync [--checksum] [--workers 8]
+                                           # 增量同步：大小和 mtime 都没变的文件不读取
   python3 deliverable.py list [--issue <id>]
   python3 deliverable.py check <issue_id>  # 检查是否有交付物
+  python3 deliverable.py usage [--physical] # 按 Issue 汇总占用空间（--physical 统计去重后的实际占用）
+  python3 deliverable.py dedup             # 把已有的 issue-NNN/ 文件收进对象存储（clone 后重建链接）
+  python3 deliverable.py gc                # 删除没有清单引用的对象
+  python3 deliverable.py archive --closed-before 2026-01-01 [--dry-run] [--force]
+                                           # 把关闭较早的 Issue 的交付物打包成冷存储归档（见 cold_storage.py）
+  python3 deliverable.py files <issue_id>  # 列出 Issue 的交付物文件（已归档的从归档索引读取）
+  python3 deliverable.py extract <issue_id> <路径> [--output DIR]
+                                           # 从归档中取出单个文件或子目录
+  python3 deliverable.py verify [--issue <id>] [--rehash] [--workers 8]
+                                           # 按清单校验交付物是否被损坏或修改
 """
 
 import sys
+import hashlib
 import json
-import shutil
+import zlib
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
 import argparse
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import json_codec
+import cold_storage
+from blob_store import BlobStore, hash_file, is_executable
+from issue_store import IssueStore
 
 # 自动检测工作区根目录
 import os
@@ -42,13 +67,34 @@ def find_workspace():
 WORKSPACE = find_workspace()
 DELIVERABLES_DIR = WORKSPACE / ".issues" / "deliverables"
 DELIVERABLES_INDEX = DELIVERABLES_DIR / "index.json"
+OBJECTS_DIR = DELIVERABLES_DIR / ".objects"
+MANIFESTS_DIR = DELIVERABLES_DIR / "manifests"
+ARCHIVE_DIR = DELIVERABLES_DIR / "archive"
+# verify 的哈希缓存：路径 -> [size, mtime_ns, inode, 结果]，inode 只在本机有效，不提交
+VERIFY_CACHE = DELIVERABLES_DIR / ".verify-cache.json"
+
+# 不收进交付物的系统文件
+IGNORED_NAMES = {".DS_Store", "Thumbs.db"}
+
+# 哈希和复制文件的线程数（I/O 为主，hashlib 处理大块数据时释放 GIL）
+DEFAULT_WORKERS = 8
 
 
 class DeliverableManager:
+    """交付物索引和存储
+    
+    索引条目记录 bytes / files（原始字节数和文件数，由清单增量维护）以及展示用的 size 字符串；
+    by_issue 是 issue_id -> 条目列表的映射，按 Issue 查询不需要扫描整个索引。
+    """
+    
     def __init__(self):
         self.workspace = WORKSPACE
         self.deliverables_dir = DELIVERABLES_DIR
         self.index_file = DELIVERABLES_INDEX
+        self.store = BlobStore(OBJECTS_DIR)
+        self.manifests_dir = MANIFESTS_DIR
+        self.archive_dir = ARCHIVE_DIR
+        self.verify_cache_file = VERIFY_CACHE
         
         # 确保目录存在
         self.deliverables_dir.mkdir(parents=True, exist_ok=True)
@@ -59,62 +105,593 @@ class DeliverableManager:
         """加载交付物索引"""
         if self.index_file.exists():
             try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    self.index = json.load(f)
+                self.index = json_codec.load_file(self.index_file)
             except (json.JSONDecodeError, IOError):
                 self.index = {"deliverables": []}
         else:
             self.index = {"deliverables": []}
+        self.by_issue = defaultdict(list)
+        for entry in self.index["deliverables"]:
+            self.by_issue[entry["issue_id"]].append(entry)
+    
+    def entries_for(self, issue_id):
+        """指定 Issue 的交付物条目"""
+        return self.by_issue.get(issue_id, [])
     
     def save_index(self):
         """保存交付物索引"""
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(self.index, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(self.index, self.index_file, pretty=True)
+    
+    def issue_dir(self, issue_id):
+        return self.deliverables_dir / f"issue-{issue_id:03d}"
+    
+    def manifest_file(self, issue_id):
+        return self.manifests_dir / f"issue-{issue_id:03d}.json"
+    
+    def load_manifest(self, issue_id):
+        """Issue 的文件清单 {Issue 目录内相对路径: {sha256, size}}"""
+        path = self.manifest_file(issue_id)
+        if path.exists():
+            try:
+                return json_codec.load_file(path).get("files", {})
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+    
+    def save_manifest(self, issue_id, files):
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        data = {"issue_id": issue_id, "files": dict(sorted(files.items()))}
+        json_codec.dump_file(data, self.manifest_file(issue_id), pretty=True)
+    
+    def _source_files(self, source):
+        """[(源文件, Issue 目录内相对路径)]；目录按相对路径排序"""
+        if source.is_file():
+            return [(source, source.name)]
+        files = []
+        for path in sorted(source.rglob('*')):
+            if path.is_file() and path.name not in IGNORED_NAMES:
+                files.append((path, f"{source.name}/{path.relative_to(source).as_posix()}"))
+        return files
+    
+    def _store_file(self, issue_id, path, rel, known, quick, verify=False):
+        """把一个文件收进对象存储并链接到 Issue 目录（线程池任务）
+        
+        quick: 大小和 mtime 与清单一致、已链接且对象身份与清单记录一致时直接跳过，不读取文件
+        verify: 已链接的对象也重新哈希（--checksum）；不指定时只在对象的 inode / 大小 / mtime
+                与清单记录不符时重新哈希。对象内容与源文件不符（被原地改写）时用源文件修复
+        返回 (rel, 清单项, 状态, 写入字节, 去重字节)，状态为 added / updated / repaired / unchanged / skipped
+        """
+        st = path.stat()
+        executable = is_executable(st.st_mode)
+        dest = self.issue_dir(issue_id) / rel
+        if (quick and known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns
+                and known.get("executable", False) == executable
+                and self.store.is_linked(known["sha256"], dest, executable)
+                and self._stamp_matches(known, dest.stat())):
+            return rel, known, "skipped", 0, 0
+        digest, size = hash_file(path)
+        entry = {"sha256": digest, "size": size, "mtime_ns": st.st_mtime_ns}
+        if executable:
+            entry["executable"] = True
+        if known and known["sha256"] == digest and self.store.is_linked(digest, dest, executable):
+            if self._object_intact(digest, executable, known, verify):
+                return rel, self._stamp_stored(entry, dest), "unchanged", 0, 0
+            self.store.repair(path, digest, executable)
+            return rel, self._stamp_stored(entry, dest), "repaired", size, 0
+        deduplicated = size if self.store.has(digest, executable) else 0
+        self.store.put(path, digest, executable, verify=verify)
+        self.store.materialize(digest, dest, executable)
+        return rel, self._stamp_stored(entry, dest), "updated" if known else "added", size - deduplicated, deduplicated
+    
+    @staticmethod
+    def _stamp_matches(known, st):
+        """文件的 inode / 大小 / mtime 是否仍是清单写入时记录的"""
+        return (st.st_ino == known.get("inode") and st.st_size == known.get("size")
+                and st.st_mtime_ns == known.get("inode_mtime_ns"))
+    
+    def _object_intact(self, digest, executable, known, verify):
+        """已链接的对象内容是否仍是 digest：身份与清单记录一致且不要求 verify 时直接认可，否则重新哈希"""
+        target = self.store.path(digest, executable)
+        if not verify and self._stamp_matches(known, target.stat()):
+            return True
+        return hash_file(target)[0] == digest
+    
+    @staticmethod
+    def _stamp_stored(entry, dest):
+        """在清单项中记下 Issue 目录中文件的 inode 和 mtime（内容已确认时），API 据此判断 sha256 是否仍然可信"""
+        st = dest.stat()
+        return {**entry, "inode": st.st_ino, "inode_mtime_ns": st.st_mtime_ns}
+    
+    def _store_files(self, issue_id, files, sources, counts, quick=False, verify=False, workers=DEFAULT_WORKERS):
+        """并行处理 [(源文件, 相对路径)]，更新清单 files 和 counts；返回清单是否有变化"""
+        def task(item):
+            path, rel = item
+            return self._store_file(issue_id, path, rel, files.get(rel), quick, verify)
+        
+        if workers > 1 and len(sources) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(task, sources))
+        else:
+            results = [task(item) for item in sources]
+        
+        changed = False
+        for rel, entry, status, written, deduplicated in results:
+            counts[status] += 1
+            counts["written"] += written
+            counts["deduplicated"] += deduplicated
+            if entry != files.get(rel):
+                files[rel] = entry
+                changed = True
+        return changed
     
-    def add(self, issue_id, file_path, description=""):
-        """添加交付物"""
+    def _remove_file(self, issue_id, files, rel):
+        dest = self.issue_dir(issue_id) / rel
+        if dest.exists():
+            dest.unlink()
+        files.pop(rel, None)
+        # 清理空目录（不删除 Issue 目录本身）
+        parent = dest.parent
+        issue_dir = self.issue_dir(issue_id)
+        while parent != issue_dir and parent.exists() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    
+    def add(self, issue_id, file_path, description="", sync=False, checksum=False, workers=DEFAULT_WORKERS):
+        """添加交付物（重复添加时只更新内容变化的文件，目录中已删除的文件同步删除）
+        
+        sync: 大小和 mtime 与上次添加时一致的文件直接跳过，不读取内容（checksum=True 时仍按哈希比较，
+              并重新校验已链接的对象，被原地改写的对象用源文件修复）
+        """
         source = Path(file_path)
         if not source.exists():
             print(f"❌ 文件不存在: {file_path}")
             return None
         
         # 创建 Issue 专属目录
-        issue_dir = self.deliverables_dir / f"issue-{issue_id:03d}"
+        issue_dir = self.issue_dir(issue_id)
         issue_dir.mkdir(exist_ok=True)
-        
-        # 复制文件到交付物目录
         dest = issue_dir / source.name
-        if source.is_file():
-            shutil.copy2(source, dest)
-        elif source.is_dir():
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(source, dest)
-        
-        # 记录到索引
-        entry = {
-            "issue_id": issue_id,
-            "filename": source.name,
-            "path": str(dest.relative_to(self.workspace)),
-            "description": description,
-            "added_at": datetime.now().isoformat(),
-            "size": self._get_size(dest)
-        }
-        
-        self.index["deliverables"].append(entry)
-        self.save_index()
         
-        print(f"✅ 交付物已添加到 Issue #{issue_id}")
-        print(f"   文件: {source.name}")
-        print(f"   位置: {dest.relative_to(self.workspace)}")
+        started = time.perf_counter()
+        files = self.load_manifest(issue_id)
+        counts = self._new_counts()
+        sources = self._source_files(source)
+        changed = self._store_files(issue_id, files, sources, counts,
+                                    quick=sync and not checksum, verify=checksum, workers=workers)
+        
+        # 重新添加目录时，源目录中已不存在的文件从交付物中删除（代替原来的 rmtree + copytree）
+        if source.is_dir():
+            current = {rel for _, rel in sources}
+            prefix = f"{source.name}/"
+            for rel in [r for r in files if r.startswith(prefix) and r not in current]:
+                self._remove_file(issue_id, files, rel)
+                counts["removed"] += 1
+                changed = True
+        
+        # 记录到索引：同一路径只保留一条，重复添加时更新
+        rel_path = str(dest.relative_to(self.workspace))
+        entry = next((d for d in self.entries_for(issue_id) if d.get("path") == rel_path), None)
+        if entry is None:
+            entry = {
+                "issue_id": issue_id,
+                "filename": source.name,
+                "path": rel_path,
+                "description": description,
+                "added_at": datetime.now().isoformat()
+            }
+            self._set_totals(entry, *self._entry_totals(files, source.name))
+            self.index["deliverables"].append(entry)
+            self.by_issue[issue_id].append(entry)
+            changed = True
+        elif changed or (description and description != entry.get("description")):
+            if description:
+                entry["description"] = description
+            # 归档后重新添加：文件回到 Issue 目录，不再从归档读取
+            entry.pop("archive", None)
+            self._set_totals(entry, *self._entry_totals(files, source.name))
+            entry["updated_at"] = datetime.now().isoformat()
+            changed = True
+        
+        if changed:
+            self.save_manifest(issue_id, files)
+            self.save_index()
+            print(f"✅ 交付物已添加到 Issue #{issue_id}")
+            print(f"   文件: {source.name}")
+            print(f"   位置: {dest.relative_to(self.workspace)}")
+        else:
+            print(f"✅ Issue #{issue_id} 的交付物 {source.name} 没有变化")
+        self._print_counts(counts, time.perf_counter() - started)
         return entry
     
+    def _new_counts(self):
+        return {"added": 0, "updated": 0, "repaired": 0, "unchanged": 0, "skipped": 0, "removed": 0,
+                "written": 0, "deduplicated": 0}
+    
+    def _print_counts(self, counts, elapsed):
+        copied = counts["added"] + counts["updated"]
+        elapsed = max(elapsed, 1e-6)
+        print(f"   新增 {counts['added']}，更新 {counts['updated']}，删除 {counts['removed']}，"
+              f"跳过 {counts['skipped'] + counts['unchanged']}（未读取 {counts['skipped']}，内容相同 {counts['unchanged']}）")
+        if counts["repaired"]:
+            print(f"   修复被原地改写的对象 {counts['repaired']} 个（共用这些对象的其他 Issue 一并恢复）")
+        print(f"   写入 {self._format_size(counts['written'])}（去重节省 {self._format_size(counts['deduplicated'])}），"
+              f"用时 {elapsed:.2f}s，{copied / elapsed:.1f} 文件/s，{self._format_size(counts['written'] / elapsed)}/s")
+    
+    def dedup(self):
+        """把 issue-NNN/ 下的现有文件收进对象存储并替换为硬链接，补齐清单"""
+        started = time.perf_counter()
+        counts = self._new_counts()
+        index_changed = False
+        for issue_dir in sorted(self.deliverables_dir.glob("issue-*")):
+            try:
+                issue_id = int(issue_dir.name.split("-", 1)[1])
+            except ValueError:
+                continue
+            if not issue_dir.is_dir():
+                continue
+            files = self.load_manifest(issue_id)
+            sources = [(path, path.relative_to(issue_dir).as_posix()) for path in sorted(issue_dir.rglob('*'))
+                       if path.is_file() and path.name not in IGNORED_NAMES]
+            changed = self._store_files(issue_id, files, sources, counts)
+            # 清单中有、磁盘上已没有的文件
+            for rel in [r for r in files if not (issue_dir / r).exists()]:
+                files.pop(rel)
+                counts["removed"] += 1
+                changed = True
+            if changed:
+                self.save_manifest(issue_id, files)
+            # 补齐旧条目的字节数和文件数
+            for entry in self.entries_for(issue_id):
+                rel = self._entry_rel(entry)
+                if rel is not None:
+                    totals = self._entry_totals(files, rel)
+                    if (entry.get("bytes"), entry.get("files")) != totals:
+                        self._set_totals(entry, *totals)
+                        index_changed = True
+        if index_changed:
+            self.save_index()
+        print(f"✅ 收进对象存储 {counts['added'] + counts['updated']} 个文件，已是链接 {counts['unchanged']} 个，"
+              f"清单移除 {counts['removed']} 个")
+        self._print_counts(counts, time.perf_counter() - started)
+        return counts
+    
+    def gc(self):
+        """删除没有任何清单引用的对象"""
+        removed, freed = self._collect_garbage()
+        print(f"🧹 删除 {removed} 个未引用对象，释放 {self._format_size(freed)}")
+        return removed
+    
+    def _collect_garbage(self):
+        """删除未引用对象，返回 (对象数, 释放字节数)"""
+        referenced = set()
+        for path in self.manifests_dir.glob("issue-*.json"):
+            try:
+                files = json_codec.load_file(path).get("files", {})
+            except (json.JSONDecodeError, IOError):
+                continue
+            referenced.update((f["sha256"], f.get("executable", False)) for f in files.values())
+        removed = 0
+        freed = 0
+        for key in list(self.store.keys()):
+            if key not in referenced:
+                freed += self.store.remove(*key)
+                removed += 1
+        return removed, freed
+    
+    def archive(self, closed_before, dry_run=False, force=False):
+        """把 closed_before 之前关闭的 Issue 的交付物目录打包成冷存储归档
+        
+        打包前按清单校验每个文件，与清单不符（被修改、不在清单中、缺失或没有清单）的 Issue 不归档，
+        force=True 时照现状归档；
+        归档读回校验通过后删除 issue-NNN/ 和清单，对象存储中不再被引用的内容随之回收；
+        索引条目记录归档路径，list / files 照常可用，单个文件用 extract 取出
+        """
+        cutoff = self._parse_time(closed_before)
+        if cutoff is None:
+            print(f"❌ 无效日期: {closed_before}")
+            return None
+        
+        candidates = []
+        for issue in IssueStore(self.workspace / ".issues").issues():
+            if issue.get("status") != "closed":
+                continue
+            closed_at = self._parse_time(issue.get("closed_at") or issue.get("updated_at"))
+            if closed_at is None or closed_at >= cutoff:
+                continue
+            issue_id = int(issue["id"])
+            if self.issue_dir(issue_id).is_dir():
+                candidates.append(issue_id)
+        
+        if not candidates:
+            print(f"📋 没有 {closed_before} 之前关闭、且有交付物目录的 Issue")
+            return []
+        
+        archived = []
+        refused = []
+        inodes = {}
+        totals = {"files": 0, "bytes": 0, "archive": 0}
+        for issue_id in sorted(candidates):
+            issue_dir = self.issue_dir(issue_id)
+            previous = cold_storage.load_index(self.archive_dir, issue_id)
+            # 归档的 sha256 取自磁盘上的内容，先确认它与清单一致，免得把被改动的文件当作原件封存
+            problems = self._archive_problems(issue_id, previous["members"] if previous else {})
+            if problems:
+                for problem, rel in problems:
+                    print(f"  ❌ Issue #{issue_id:03d}: {problem} {rel}")
+                if not force:
+                    refused.append(issue_id)
+                    continue
+            restored = set()
+            if previous and not dry_run:
+                # 归档后又添加过文件：先取回旧归档中被覆盖以外的成员，合并成一个新归档
+                archive_file = self.archive_dir / previous["archive"]
+                for rel, member in previous["members"].items():
+                    if not (issue_dir / rel).exists():
+                        cold_storage.extract_member(archive_file, member, issue_dir / rel)
+                        restored.add(rel)
+            sources = [(path, path.relative_to(issue_dir).as_posix()) for path in sorted(issue_dir.rglob('*'))
+                       if path.is_file() and path.name not in IGNORED_NAMES]
+            size = sum(path.stat().st_size for path, _ in sources)
+            if dry_run:
+                print(f"  Issue #{issue_id:03d}: {len(sources)} 个文件，{self._format_size(size)}")
+                archived.append(issue_id)
+                continue
+            if not sources:
+                shutil.rmtree(issue_dir)
+                continue
+            
+            # 记下删除前的 inode：独占的文件删除即释放，对象的链接要等对象被回收（临时取回的旧成员不计）
+            files = self.load_manifest(issue_id)
+            for path, rel in sources:
+                if rel in restored:
+                    continue
+                st = path.stat()
+                known = files.get(rel, {})
+                key = (known.get("sha256"), known.get("executable", False))
+                if st.st_nlink == 1:
+                    inodes[(st.st_dev, st.st_ino)] = (self._disk_bytes(st), None)
+                elif key[0] and self.store.is_linked(key[0], path, key[1]):
+                    inodes[(st.st_dev, st.st_ino)] = (self._disk_bytes(st), key)
+            
+            index = cold_storage.write_archive(issue_id, issue_dir, sources, self.archive_dir)
+            shutil.rmtree(issue_dir)
+            manifest = self.manifest_file(issue_id)
+            if manifest.exists():
+                manifest.unlink()
+            archive_rel = str((self.archive_dir / index["archive"]).relative_to(self.workspace))
+            for entry in self.entries_for(issue_id):
+                entry["archive"] = archive_rel
+            
+            totals["files"] += len(sources)
+            totals["bytes"] += size
+            totals["archive"] += index["bytes"] - (previous["bytes"] if previous else 0)
+            archived.append(issue_id)
+            print(f"  Issue #{issue_id:03d}: {len(sources)} 个文件，{self._format_size(size)} → "
+                  f"{self._format_size(index['bytes'])}")
+        
+        if refused:
+            print(f"\n⚠️ {len(refused)} 个 Issue 与清单不符，{'将' if dry_run else '已'}跳过: "
+                  f"{', '.join(f'#{i:03d}' for i in refused)}（确认现状无误后用 --force 归档）")
+        if dry_run:
+            print(f"\n📋 将归档 {len(archived)} 个 Issue（--dry-run，未做修改）")
+            return archived
+        
+        self.save_index()
+        self._collect_garbage()
+        freed = sum(blocks for blocks, key in inodes.values() if key is None or not self.store.has(*key))
+        print(f"\n📦 已归档 {len(archived)} 个 Issue，{totals['files']} 个文件，"
+              f"原始 {self._format_size(totals['bytes'])}，归档 {self._format_size(totals['archive'])}")
+        print(f"🧹 释放磁盘 {self._format_size(freed)}，净回收 {self._format_size(max(0, freed - totals['archive']))}")
+        return archived
+    
+    def _archive_problems(self, issue_id, archived):
+        """Issue 目录与清单不一致之处 [(问题, 相对路径)]；archived 是旧归档的成员（不要求在磁盘上）"""
+        issue_dir = self.issue_dir(issue_id)
+        live = {path.relative_to(issue_dir).as_posix(): path for path in sorted(issue_dir.rglob('*'))
+                if path.is_file() and path.name not in IGNORED_NAMES}
+        manifest = self.load_manifest(issue_id)
+        if not manifest:
+            return [("没有清单，无法校验（先运行 dedup 或 verify 建立基准）", issue_dir.name)] if live else []
+        problems = []
+        for rel, path in live.items():
+            expected = manifest.get(rel)
+            if expected is None:
+                problems.append(("不在清单中", rel))
+            elif path.stat().st_size != expected["size"] or hash_file(path)[0] != expected["sha256"]:
+                problems.append(("内容已改变", rel))
+        problems.extend(("文件缺失", rel) for rel in sorted(manifest.keys() - live.keys() - archived.keys()))
+        return problems
+    
+    def archived_members(self, issue_id):
+        """(归档文件, 成员字典)，未归档时为 (None, {})"""
+        index = cold_storage.load_index(self.archive_dir, issue_id)
+        if index is None:
+            return None, {}
+        return self.archive_dir / index["archive"], index["members"]
+    
+    def list_files(self, issue_id):
+        """列出 Issue 的交付物文件：Issue 目录中的读清单，已归档的读归档索引（都不扫描磁盘）"""
+        live = self.load_manifest(issue_id)
+        _, members = self.archived_members(issue_id)
+        if not live and not members:
+            print(f"📋 Issue #{issue_id} 暂无交付物文件")
+            return []
+        
+        rows = [(rel, info["size"], "") for rel, info in live.items()]
+        rows += [(rel, info["size"], "（已归档）") for rel, info in members.items() if rel not in live]
+        rows.sort()
+        print(f"\n📦 Issue #{issue_id} 的交付物文件 ({len(rows)} 个)\n")
+        for rel, size, note in rows:
+            print(f"  {rel}  {self._format_size(size)}{note}")
+        return rows
+    
+    def extract(self, issue_id, path, output=None):
+        """从归档中取出单个文件或子目录（只解压匹配的成员）"""
+        archive_file, members = self.archived_members(issue_id)
+        if archive_file is None:
+            print(f"❌ Issue #{issue_id} 没有归档")
+            return []
+        path = path.strip("/")
+        prefix = path + "/"
+        matched = [rel for rel in members if rel == path or rel.startswith(prefix)]
+        if not matched:
+            print(f"❌ 归档中没有 {path}")
+            return []
+        output = Path(output) if output else Path.cwd()
+        for rel in matched:
+            cold_storage.extract_member(archive_file, members[rel], output / rel)
+        print(f"✅ 从 Issue #{issue_id} 的归档取出 {len(matched)} 个文件到 {output}")
+        return matched
+    
+    def verify(self, issue_id=None, rehash=False, workers=DEFAULT_WORKERS):
+        """校验交付物没有被损坏或修改
+        
+        Issue 目录中的文件与清单中的 sha256 比较（还没有清单的 Issue 以当前内容建立清单），
+        已归档的 Issue 逐个校验归档成员。(size, mtime, inode) 与上次校验时相同的文件复用缓存的结果，
+        rehash=True 时全部重新计算；需要计算的文件按大小从大到小交给线程池。
+        """
+        started = time.perf_counter()
+        cache = {} if rehash else self._load_verify_cache()
+        results = {}
+        pending = []
+        plans = {}
+        
+        for current in self._verify_issue_ids(issue_id):
+            issue_dir = self.issue_dir(current)
+            files = []
+            if issue_dir.is_dir():
+                for path in sorted(issue_dir.rglob('*')):
+                    if path.is_file() and path.name not in IGNORED_NAMES:
+                        files.append((path.relative_to(issue_dir).as_posix(), path))
+            archive_file, members = self.archived_members(current)
+            plans[current] = (files, archive_file, members)
+            
+            targets = [(f"{issue_dir.name}/{rel}", path, "file") for rel, path in files]
+            if archive_file is not None:
+                targets.append((f"archive/{archive_file.name}", archive_file, "archive"))
+            for key, path, kind in targets:
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+                cached = cache.get(key)
+                if cached and cached[:3] == stamp:
+                    results[key] = cached
+                else:
+                    pending.append((key, path, kind, stamp, members))
+        
+        def task(item):
+            key, path, kind, stamp, members = item
+            if kind == "archive":
+                return key, stamp + [self._damaged_members(path, members)]
+            return key, stamp + [hash_file(path)[0]]
+        
+        pending.sort(key=lambda item: -item[3][0])
+        if workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results.update(executor.map(task, pending))
+        else:
+            results.update(map(task, pending))
+        
+        problems = []
+        created = 0
+        for current, (files, archive_file, members) in plans.items():
+            issue_dir = self.issue_dir(current)
+            if files:
+                manifest = self.load_manifest(current)
+                if not manifest:
+                    # 还没有清单：以当前内容为基准，之后的 verify 与它比较
+                    for rel, path in files:
+                        size, mtime_ns, inode, digest = results[f"{issue_dir.name}/{rel}"]
+                        manifest[rel] = {"sha256": digest, "size": size, "mtime_ns": mtime_ns,
+                                         "inode": inode, "inode_mtime_ns": mtime_ns}
+                        if is_executable(path.stat().st_mode):
+                            manifest[rel]["executable"] = True
+                    self.save_manifest(current, manifest)
+                    created += 1
+                on_disk = set()
+                for rel, path in files:
+                    on_disk.add(rel)
+                    expected = manifest.get(rel)
+                    if expected is None:
+                        problems.append((current, "不在清单中", rel))
+                    elif results[f"{issue_dir.name}/{rel}"][3] != expected["sha256"]:
+                        problems.append((current, "内容已改变", rel))
+                for rel in manifest:
+                    if rel not in on_disk and rel not in members:
+                        problems.append((current, "文件缺失", rel))
+            if archive_file is not None:
+                result = results.get(f"archive/{archive_file.name}")
+                if result is None:
+                    problems.append((current, "归档缺失", archive_file.name))
+                else:
+                    problems.extend((current, "归档成员损坏", rel) for rel in result[3])
+        
+        if issue_id is None:
+            cache = results
+        else:
+            cache.update(results)
+        json_codec.dump_file(cache, self.verify_cache_file)
+        
+        for current, problem, rel in problems:
+            print(f"  ❌ Issue #{current:03d}: {problem} {rel}")
+        total = sum(len(files) + len(members) for files, _, members in plans.values())
+        hashed = sum(item[3][0] for item in pending)
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        if problems:
+            print(f"❌ 校验 {len(plans)} 个 Issue、{total} 个文件，发现 {len(problems)} 个问题")
+        else:
+            print(f"✅ 校验 {len(plans)} 个 Issue、{total} 个文件，全部一致")
+        if created:
+            print(f"   为 {created} 个 Issue 新建清单")
+        print(f"   计算哈希 {len(pending)} 个（{self._format_size(hashed)}），复用缓存 {len(results) - len(pending)} 个，"
+              f"用时 {elapsed:.2f}s，{self._format_size(hashed / elapsed)}/s")
+        return problems
+    
+    def _verify_issue_ids(self, issue_id=None):
+        """有交付物目录、清单或归档的 Issue"""
+        if issue_id is not None:
+            return [issue_id]
+        ids = set()
+        for pattern in (self.deliverables_dir.glob("issue-*"), self.manifests_dir.glob("issue-*.json"),
+                        self.archive_dir.glob("issue-*.json")):
+            for path in pattern:
+                try:
+                    ids.add(int(path.name.split("-", 1)[1].split(".")[0]))
+                except ValueError:
+                    continue
+        return sorted(ids)
+    
+    def _damaged_members(self, archive_file, members):
+        """逐个读出归档成员并校验 sha256，返回损坏的成员"""
+        damaged = []
+        for rel, member in members.items():
+            digest = hashlib.sha256()
+            try:
+                for chunk in cold_storage.iter_member(archive_file, member):
+                    digest.update(chunk)
+            except (OSError, zlib.error):
+                damaged.append(rel)
+                continue
+            if digest.hexdigest() != member["sha256"]:
+                damaged.append(rel)
+        return damaged
+    
+    def _load_verify_cache(self):
+        if self.verify_cache_file.exists():
+            try:
+                return json_codec.load_file(self.verify_cache_file)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+    
     def list_deliverables(self, issue_id=None):
         """列出交付物"""
-        deliverables = self.index["deliverables"]
-        
         if issue_id:
-            deliverables = [d for d in deliverables if d["issue_id"] == issue_id]
+            deliverables = self.entries_for(issue_id)
+        else:
+            deliverables = self.index["deliverables"]
         
         if not deliverables:
             if issue_id:
@@ -131,7 +708,11 @@ class DeliverableManager:
             filename = d["filename"]
             desc = d.get("description", "")
             added_at = d.get("added_at", "")[:19]
-            size = d.get("size", "")
+            size = self._format_size(d["bytes"]) if "bytes" in d else d.get("size", "")
+            if "files" in d and d["files"] != 1:
+                size += f"（{d['files']} 个文件）"
+            if d.get("archive"):
+                size += " | 已归档"
             
             print(f"  Issue #{issue_id:03d}: {filename}")
             if desc:
@@ -143,7 +724,7 @@ class DeliverableManager:
     
     def check(self, issue_id):
         """检查 Issue 是否有交付物"""
-        deliverables = [d for d in self.index["deliverables"] if d["issue_id"] == issue_id]
+        deliverables = self.entries_for(issue_id)
         
         if deliverables:
             print(f"✅ Issue #{issue_id} 有 {len(deliverables)} 个交付物")
@@ -155,15 +736,97 @@ class DeliverableManager:
             print(f"   请使用 deliverable.py add {issue_id} --file <path> 添加交付物")
             return False
     
-    def _get_size(self, path):
-        """获取文件或目录大小"""
+    def usage(self, physical=False):
+        """按 Issue 汇总交付物占用（使用条目中的 bytes / files，不扫描磁盘）
+        
+        physical: 另外按清单统计去重后对象的实际占用
+        """
+        backfilled = False
+        totals = {}
+        for issue_id in sorted(self.by_issue):
+            issue_bytes = issue_files = 0
+            for entry in self.by_issue[issue_id]:
+                if "bytes" not in entry:
+                    # 旧条目：扫描一次磁盘后记录下来
+                    self._set_totals(entry, *self._scan_totals(self.workspace / entry["path"]))
+                    backfilled = True
+                issue_bytes += entry["bytes"]
+                issue_files += entry["files"]
+            totals[issue_id] = (len(self.by_issue[issue_id]), issue_files, issue_bytes)
+        if backfilled:
+            self.save_index()
+        
+        print(f"\n📦 交付物占用 ({len(totals)} 个 Issue)\n")
+        for issue_id, (entries, files, size) in totals.items():
+            print(f"  Issue #{issue_id:03d}: {entries} 条，{files} 个文件，{self._format_size(size)}")
+        entries = sum(t[0] for t in totals.values())
+        files = sum(t[1] for t in totals.values())
+        logical = sum(t[2] for t in totals.values())
+        print(f"\n  合计: {entries} 条，{files} 个文件，{self._format_size(logical)}")
+        
+        if physical:
+            blobs = {}
+            for path in self.manifests_dir.glob("issue-*.json"):
+                try:
+                    manifest_files = json_codec.load_file(path).get("files", {})
+                except (json.JSONDecodeError, IOError):
+                    continue
+                for info in manifest_files.values():
+                    blobs[info["sha256"], info.get("executable", False)] = info["size"]
+            stored = sum(blobs.values())
+            print(f"  对象存储: {len(blobs)} 个对象，{self._format_size(stored)}"
+                  f"（去重节省 {self._format_size(max(0, logical - stored))}）")
+            archives = [path.stat().st_size for path in self.archive_dir.glob("issue-*.zip")]
+            if archives:
+                print(f"  冷存储归档: {len(archives)} 个，{self._format_size(sum(archives))}")
+        return totals
+    
+    def _entry_rel(self, entry):
+        """条目在 Issue 目录内的相对路径（文件或目录），路径不在 Issue 目录下时为 None"""
+        issue_dir = self.issue_dir(entry["issue_id"]).relative_to(self.workspace)
+        try:
+            return Path(entry["path"]).relative_to(issue_dir).as_posix()
+        except ValueError:
+            return None
+    
+    def _entry_totals(self, files, rel):
+        """清单中属于 rel（文件或目录）的 (字节数, 文件数)"""
+        prefix = rel + "/"
+        size = count = 0
+        for path, info in files.items():
+            if path == rel or path.startswith(prefix):
+                size += info["size"]
+                count += 1
+        return size, count
+    
+    def _scan_totals(self, path):
+        """没有清单的旧条目：遍历磁盘统计 (字节数, 文件数)"""
         if path.is_file():
-            size = path.stat().st_size
-            return self._format_size(size)
-        elif path.is_dir():
-            total = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
-            return self._format_size(total)
-        return "0 B"
+            return path.stat().st_size, 1
+        if path.is_dir():
+            sizes = [f.stat().st_size for f in path.rglob('*') if f.is_file()]
+            return sum(sizes), len(sizes)
+        return 0, 0
+    
+    def _set_totals(self, entry, size, files):
+        entry["bytes"] = size
+        entry["files"] = files
+        entry["size"] = self._format_size(size)
+    
+    def _disk_bytes(self, st):
+        """文件实际占用的磁盘空间（没有 st_blocks 的平台按大小计）"""
+        blocks = getattr(st, "st_blocks", None)
+        return blocks * 512 if blocks is not None else st.st_size
+    
+    def _parse_time(self, value):
+        """ISO 时间转为不带时区的 datetime，无效时为 None"""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed.replace(tzinfo=None)
     
     def _format_size(self, size):
         """格式化文件大小"""
@@ -183,6 +846,9 @@ def main():
     p.add_argument("issue_id", type=int)
     p.add_argument("--file", required=True, help="文件或目录路径")
     p.add_argument("--description", default="", help="交付物说明")
+    p.add_argument("--sync", action="store_true", help="增量同步：大小和 mtime 没变的文件直接跳过")
+    p.add_argument("--checksum", action="store_true", help="与 --sync 一起使用：按内容哈希比较，不信任 mtime，并校验修复对象")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"并行复制的线程数（默认 {DEFAULT_WORKERS}）")
     
     # list
     p = sub.add_parser("list", help="列出交付物")
@@ -192,15 +858,59 @@ def main():
     p = sub.add_parser("check", help="检查 Issue 是否有交付物")
     p.add_argument("issue_id", type=int)
     
+    # usage
+    p = sub.add_parser("usage", help="按 Issue 汇总交付物占用")
+    p.add_argument("--physical", action="store_true", help="同时统计去重后对象的实际占用")
+    
+    # dedup / gc
+    sub.add_parser("dedup", help="把已有交付物收进对象存储（替换为硬链接）")
+    sub.add_parser("gc", help="删除没有清单引用的对象")
+    
+    # archive / files / extract
+    p = sub.add_parser("archive", help="把关闭较早的 Issue 的交付物打包成冷存储归档")
+    p.add_argument("--closed-before", required=True, help="关闭时间早于该日期（ISO 格式，如 2026-01-01）")
+    p.add_argument("--dry-run", action="store_true", help="只列出将要归档的 Issue")
+    p.add_argument("--force", action="store_true", help="与清单不符的 Issue 也照现状归档")
+    
+    p = sub.add_parser("files", help="列出 Issue 的交付物文件")
+    p.add_argument("issue_id", type=int)
+    
+    p = sub.add_parser("extract", help="从归档中取出文件或子目录")
+    p.add_argument("issue_id", type=int)
+    p.add_argument("path", help="Issue 目录内的相对路径")
+    p.add_argument("--output", help="输出目录（默认当前目录）")
+    
+    # verify
+    p = sub.add_parser("verify", help="按清单校验交付物是否被损坏或修改")
+    p.add_argument("--issue", type=int, help="只校验指定 Issue")
+    p.add_argument("--rehash", action="store_true", help="忽略缓存，重新计算全部哈希")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"计算哈希的线程数（默认 {DEFAULT_WORKERS}）")
+    
     args = parser.parse_args()
     mgr = DeliverableManager()
     
     if args.cmd == "add":
-        mgr.add(args.issue_id, args.file, args.description)
+        mgr.add(args.issue_id, args.file, args.description,
+                sync=args.sync, checksum=args.checksum, workers=args.workers)
     elif args.cmd == "list":
         mgr.list_deliverables(getattr(args, 'issue', None))
     elif args.cmd == "check":
         mgr.check(args.issue_id)
+    elif args.cmd == "usage":
+        mgr.usage(args.physical)
+    elif args.cmd == "dedup":
+        mgr.dedup()
+    elif args.cmd == "gc":
+        mgr.gc()
+    elif args.cmd == "archive":
+        mgr.archive(args.closed_before, args.dry_run, args.force)
+    elif args.cmd == "files":
+        mgr.list_files(args.issue_id)
+    elif args.cmd == "extract":
+        mgr.extract(args.issue_id, args.path, args.output)
+    elif args.cmd == "verify":
+        if mgr.verify(args.issue, args.rehash, args.workers):
+            sys.exit(1)
     else:
         parser.print_help()
 
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Issue 数据访问层
+api-server/api.py（FastAPI）、web-dashboard/api.py（Flask）和
+web-dashboard/generate_static_data.py 共用的只读接口。
+
+- index.json / deliverables/index.json: 按文件版本（inode、大小、mtime）缓存，
+  变化后整体重新加载，并建立 id -> issue、issue_id -> 交付物 的索引
+- progress.jsonl: 只追加文件，增长时只解析新增的完整行，按 issue_id 建索引；
+  被截断或替换（inode 变化）时全量重建
+- Issue Markdown: 按文件版本做有限大小的 LRU 缓存
+
+返回的列表和字典与缓存共享，调用方需要修改时先复制（get_issue / get_issues 已经返回副本）。
+
+可选的 observer(event, source, value) 回调用于统计（如 /metrics）:
+- event: "hit"（缓存命中）、"miss"（需要读盘）、"bytes"（读取字节数）、"load"（读取解析耗时，秒）
+- source: "index"、"progress"、"deliverables"、"body"
+
+用法:
+  from issue_store import IssueStore
+  store = IssueStore(workspace / ".issues")
+  issue = store.get_issue(12)
+  progress = store.progress(12)
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+import json_codec
+
+BODY_CACHE_SIZE = 256
+
+
+def file_version(path: Path):
+    """(inode, 大小, mtime_ns)，文件不存在时为 None"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def split_frontmatter(content: str):
+    """拆分 YAML frontmatter 和正文，返回 (frontmatter, body)；没有 frontmatter 时 frontmatter 为空"""
+    lines = content.split("\n")
+    if not lines or lines[0].strip() != "---":
+        return "", content.strip()
+    i = 1
+    while i < len(lines) and lines[i].strip() != "---":
+        i += 1
+    frontmatter = "\n".join(lines[1:i])
+    return frontmatter, "\n".join(lines[i + 1:]).strip()
+
+
+class IssueStore:
+    """.issues/ 目录的缓存读取器（线程安全）"""
+
+    def __init__(self, issues_dir: Path, observer=None):
+        self.issues_dir = Path(issues_dir)
+        self.observer = observer
+        self.root = self.issues_dir.parent
+        self.index_file = self.issues_dir / "index.json"
+        self.progress_file = self.issues_dir / "progress.jsonl"
+        self.deliverables_file = self.issues_dir / "deliverables" / "index.json"
+
+        self._lock = threading.RLock()
+        self._index_version = None
+        self._index = {"next_id": 1, "issues": []}
+        self._issues_by_id = {}
+
+        self._progress_inode = None
+        self._progress_offset = 0
+        self._progress = []
+        self._progress_by_issue = defaultdict(list)
+
+        self._deliverables_version = None
+        self._deliverables = []
+        self._deliverables_by_issue = defaultdict(list)
+
+        self._bodies = OrderedDict()
+
+    def _observe(self, event: str, source: str, value: float = 1):
+        if self.observer is not None:
+            try:
+                self.observer(event, source, value)
+            except Exception:
+                pass
+
+    def _loaded(self, source: str, nbytes: int, started: float):
+        self._observe("miss", source)
+        self._observe("bytes", source, nbytes)
+        self._observe("load", source, time.perf_counter() - started)
+
+    # ---------- index.json ----------
+
+    def _refresh_index(self):
+        version = file_version(self.index_file)
+        if version == self._index_version:
+            self._observe("hit", "index")
+            return
+        started = time.perf_counter()
+        if version is None:
+            index = {"next_id": 1, "issues": []}
+        else:
+            index = json_codec.load_file(self.index_file)
+        self._index = index
+        self._issues_by_id = {issue.get("id"): issue for issue in index.get("issues", [])}
+        self._index_version = version
+        self._loaded("index", version[1] if version else 0, started)
+
+    def index(self) -> dict:
+        """完整的 index.json 内容（与缓存共享，勿修改）"""
+        with self._lock:
+            self._refresh_index()
+            return self._index
+
+    def issues(self) -> list:
+        """全部 Issue 元数据（index.json 顺序，与缓存共享，勿修改）"""
+        return self.index().get("issues", [])
+
+    def get_issue(self, issue_id: int):
+        """单个 Issue 元数据的副本，不存在时返回 None"""
+        with self._lock:
+            self._refresh_index()
+            issue = self._issues_by_id.get(issue_id)
+        return dict(issue) if issue is not None else None
+
+    def get_issues(self, issue_ids) -> dict:
+        """批量查询，返回 {id: Issue 副本}，不存在的 ID 不出现在结果中"""
+        with self._lock:
+            self._refresh_index()
+            found = {issue_id: self._issues_by_id.get(issue_id) for issue_id in issue_ids}
+        return {issue_id: dict(issue) for issue_id, issue in found.items() if issue is not None}
+
+    # ---------- progress.jsonl ----------
+
+    def _reset_progress(self):
+        self._progress_inode = None
+        self._progress_offset = 0
+        self._progress = []
+        self._progress_by_issue = defaultdict(list)
+
+    def _refresh_progress(self):
+        version = file_version(self.progress_file)
+        if version is None:
+            if self._progress_inode is not None:
+                self._reset_progress()
+            return
+        inode, size, _ = version
+        if inode != self._progress_inode or size < self._progress_offset:
+            self._reset_progress()
+            self._progress_inode = inode
+        if size == self._progress_offset:
+            self._observe("hit", "progress")
+            return
+
+        started = time.perf_counter()
+        with open(self.progress_file, "rb") as f:
+            f.seek(self._progress_offset)
+            data = f.read(size - self._progress_offset)
+        # 只消费完整的行，末尾写了一半的记录留到下次
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json_codec.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._progress.append(record)
+            self._progress_by_issue[record.get("issue_id")].append(record)
+        self._progress_offset += end
+        self._loaded("progress", len(data), started)
+
+    def all_progress(self) -> list:
+        """全部进度记录（文件顺序）的副本列表"""
+        with self._lock:
+            self._refresh_progress()
+            return list(self._progress)
+
+    def progress(self, issue_id: int) -> list:
+        """指定 Issue 的进度记录（文件顺序）"""
+        with self._lock:
+            self._refresh_progress()
+            return list(self._progress_by_issue.get(issue_id, ()))
+
+    def progress_batch(self, issue_ids) -> dict:
+        """{issue_id: 进度记录列表}，没有记录的 ID 对应空列表"""
+        with self._lock:
+            self._refresh_progress()
+            return {issue_id: list(self._progress_by_issue.get(issue_id, ())) for issue_id in issue_ids}
+
+    # ---------- deliverables/index.json ----------
+
+    def _refresh_deliverables(self):
+        version = file_version(self.deliverables_file)
+        if version == self._deliverables_version:
+            self._observe("hit", "deliverables")
+            return
+        started = time.perf_counter()
+        deliverables = []
+        if version is not None:
+            try:
+                deliverables = json_codec.load_file(self.deliverables_file).get("deliverables", [])
+            except json.JSONDecodeError:
+                deliverables = []
+        by_issue = defaultdict(list)
+        for item in deliverables:
+            by_issue[item.get("issue_id")].append(item)
+        self._deliverables = deliverables
+        self._deliverables_by_issue = by_issue
+        self._deliverables_version = version
+        self._loaded("deliverables", version[1] if version else 0, started)
+
+    def all_deliverables(self) -> list:
+        """全部交付物记录的副本列表"""
+        with self._lock:
+            self._refresh_deliverables()
+            return list(self._deliverables)
+
+    def deliverables(self, issue_id: int) -> list:
+        """指定 Issue 的交付物记录"""
+        with self._lock:
+            self._refresh_deliverables()
+            return list(self._deliverables_by_issue.get(issue_id, ()))
+
+    def deliverables_batch(self, issue_ids) -> dict:
+        """{issue_id: 交付物列表}，没有交付物的 ID 对应空列表"""
+        with self._lock:
+            self._refresh_deliverables()
+            return {issue_id: list(self._deliverables_by_issue.get(issue_id, ())) for issue_id in issue_ids}
+
+    # ---------- Issue Markdown ----------
+
+    def issue_path(self, issue: dict):
+        """Issue Markdown 文件的绝对路径（index 中没有记录时为 None）"""
+        file_path = issue.get("file", "")
+        return self.root / file_path if file_path else None
+
+    def read_issue_file(self, path: Path):
+        """读取 Issue Markdown，返回 (content, body)；文件不存在时返回 None"""
+        version = file_version(path)
+        if version is None:
+            return None
+        key = str(path)
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached and cached[0] == version:
+                self._bodies.move_to_end(key)
+                self._observe("hit", "body")
+                return cached[1]
+        started = time.perf_counter()
+        content = path.read_text(encoding="utf-8")
+        result = (content, split_frontmatter(content)[1])
+        self._loaded("body", version[1], started)
+        with self._lock:
+            self._bodies[key] = (version, result)
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > BODY_CACHE_SIZE:
+                self._bodies.popitem(last=False)
+        return result
+
+    def issue_content(self, issue: dict):
+        """Issue 的 (content, body)，没有对应文件时返回 None"""
+        path = self.issue_path(issue)
+        return self.read_issue_file(path) if path else None
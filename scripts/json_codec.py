@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+可插拔的 JSON 编解码层
+优先使用 orjson，其次 msgspec，都没有安装时退回标准库 json。
+
+所有后端的行为保持一致：
+- 输出 UTF-8，不转义非 ASCII 字符（等同 ensure_ascii=False）
+- 默认紧凑输出；pretty=True 时使用 2 空格缩进
+- 解码失败统一抛出 json.JSONDecodeError，调用方原有的 except 无需修改
+
+可以用环境变量 ISSUE_JSON_BACKEND=orjson|msgspec|json 强制选择后端。
+
+用法:
+  import json_codec
+  data = json_codec.load_file(path)
+  json_codec.dump_file(data, path, pretty=True)
+  body = json_codec.dumps_bytes(payload)
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+class Codec:
+    """一个 JSON 后端：loads(bytes|str) / dumps(obj, pretty) -> bytes"""
+
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, pretty=False) -> bytes:
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2)
+        else:
+            text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return text.encode("utf-8")
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data):
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        return self._orjson.loads(data)
+
+    def dumps(self, obj, pretty=False) -> bytes:
+        options = self._options | (self._orjson.OPT_INDENT_2 if pretty else 0)
+        return self._orjson.dumps(obj, option=options)
+
+
+class MsgspecCodec(Codec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            doc = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+            raise json.JSONDecodeError(str(e), doc, 0) from None
+
+    def dumps(self, obj, pretty=False) -> bytes:
+        data = self._encoder.encode(obj)
+        if pretty:
+            data = self._msgspec.json.format(data, indent=2)
+        return data
+
+
+BACKENDS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": Codec,
+}
+
+
+def available_backends() -> list:
+    """当前环境可用的后端名称（按优先级）"""
+    names = []
+    for name, cls in BACKENDS.items():
+        try:
+            cls()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _select(preferred=None) -> Codec:
+    order = [preferred] if preferred else list(BACKENDS)
+    for name in order:
+        try:
+            return BACKENDS[name]()
+        except (ImportError, KeyError):
+            continue
+    return Codec()
+
+
+_codec = _select(os.environ.get("ISSUE_JSON_BACKEND"))
+
+
+def get_codec() -> Codec:
+    return _codec
+
+
+def set_backend(name: str) -> Codec:
+    """切换后端（不可用时退回标准库），返回生效的后端"""
+    global _codec
+    _codec = _select(name)
+    return _codec
+
+
+def loads(data):
+    """解码 JSON（str 或 bytes）"""
+    return _codec.loads(data)
+
+
+def dumps_bytes(obj, pretty=False) -> bytes:
+    """编码为 UTF-8 bytes（用于 HTTP 响应体和文件写入）"""
+    return _codec.dumps(obj, pretty)
+
+
+def dumps(obj, pretty=False) -> str:
+    """编码为 str"""
+    return _codec.dumps(obj, pretty).decode("utf-8")
+
+
+def load_file(path):
+    """读取 JSON 文件"""
+    return _codec.loads(Path(path).read_bytes())
+
+
+def dump_file(obj, path, pretty=False):
+    """写入 JSON 文件（pretty 时末尾不追加换行，与 json.dump(indent=2) 一致）"""
+    Path(path).write_bytes(_codec.dumps(obj, pretty))
@@ -18,6 +18,7 @@ from datetime import datetime
 
 # 导入权限控制模块
 from auth import require_create_permission
+import json_codec
 
 # 自动检测工作区根目录：优先使用共享目录
 import os
@@ -74,8 +75,7 @@ class IssueManager:
         """加载索引"""
         if self.index_file.exists():
             try:
-                with open(self.index_file, 'r') as f:
-                    self.index = json.load(f)
+                self.index = json_codec.load_file(self.index_file)
             except (json.JSONDecodeError, IOError):
                 self.index = {"issues": [], "next_id": 1}
         else:
@@ -83,8 +83,7 @@ class IssueManager:
     
     def save_index(self):
         """保存索引"""
-        with open(self.index_file, 'w') as f:
-            json.dump(self.index, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(self.index, self.index_file, pretty=True)
     
     @require_create_permission()
     def create(self, title, body="", priority="P2", labels=None, assignee=None, assigned_at=None):
@@ -362,8 +361,7 @@ updated_at: {timestamp}
             try:
                 from deliverable import DeliverableManager
                 dm = DeliverableManager()
-                deliverables = [d for d in dm.index["deliverables"] if d["issue_id"] == issue_id]
-                if not deliverables:
+                if not dm.entries_for(issue_id):
                     print(f"❌ Issue #{issue_id} 没有交付物，无法关闭")
                     print(f"   请先使用 deliverable.py add {issue_id} --file <path> 添加交付物")
                     print(f"   或使用 --no-check-deliverable 跳过检查（不推荐）")
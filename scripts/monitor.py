@@ -4,16 +4,28 @@
 定期检查任务状态，对超时或停滞的任务发出提醒
 
 用法:
-  python3 monitor.py check [--timeout-hours 24] [--notify]
+  python3 monitor.py check [--timeout-hours 24] [--notify] [--notify-workers 8] [--notify-timeout 10] [--notify-retries 2]
+                           [--notify-deadline 60]
   python3 monitor.py status <issue_id>
+
+通知默认通过 openclaw sessions send 发送，可用 ISSUE_NOTIFY_COMMAND 换成其他命令（如测试用的本地桩），
+命令按 shell 规则拆分，参数中的 {assignee} / {message} 会被替换:
+  ISSUE_NOTIFY_COMMAND='python3 stub.py {assignee}' python3 monitor.py check --notify
 """
 
 import sys
 import json
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
 import argparse
 
+import json_codec
+
 # 自动检测工作区根目录
 import os
 def find_workspace():
@@ -41,9 +53,45 @@ WORKSPACE = find_workspace()
 ISSUES_DIR = WORKSPACE / ".issues"
 PROGRESS_LOG = ISSUES_DIR / "progress.jsonl"
 
+# 通知命令模板
+NOTIFY_COMMAND = ["openclaw", "sessions", "send", "--label", "{assignee}", "--message", "{message}"]
+# 同时发送的通知数、单次调用超时（秒）、失败后的重试次数
+NOTIFY_WORKERS = 8
+NOTIFY_TIMEOUT = 10
+NOTIFY_RETRIES = 2
+# 第 n 次重试前等待 NOTIFY_BACKOFF * 2^(n-1) 秒
+NOTIFY_BACKOFF = 1.0
+# 整轮通知的总时限（秒），应小于 check 的调度间隔；到时仍未送达的记为失败
+NOTIFY_DEADLINE = 60
+
+
+class NotificationError(Exception):
+    """通知发送失败（可以重试）"""
+
+
+def command_transport(command=None):
+    """按命令模板发送通知的 transport(assignee, message, timeout)
+    
+    command 默认取 ISSUE_NOTIFY_COMMAND，没有时使用 openclaw sessions send；
+    命令退出码非 0 时抛出 NotificationError，超时抛出 subprocess.TimeoutExpired
+    """
+    if command is None:
+        env_command = os.environ.get("ISSUE_NOTIFY_COMMAND")
+        command = shlex.split(env_command) if env_command else NOTIFY_COMMAND
+    
+    def send(assignee, message, timeout):
+        args = [part.replace("{assignee}", assignee).replace("{message}", message) for part in command]
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise NotificationError(result.stderr.strip() or f"退出码 {result.returncode}")
+    
+    return send
+
 
 class TaskMonitor:
-    def __init__(self):
+    def __init__(self, transport=None):
+        """transport(assignee, message, timeout): 发送一条通知，失败时抛出异常；默认按命令模板调用外部命令"""
+        self.transport = transport or command_transport()
         self.workspace = WORKSPACE
         self.issues_dir = ISSUES_DIR
         self.progress_log = PROGRESS_LOG
@@ -54,8 +102,7 @@ class TaskMonitor:
         if not self.index_file.exists():
             return {"issues": [], "next_id": 1}
         
-        with open(self.index_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_codec.load_file(self.index_file)
     
     def get_latest_progress(self, issue_id):
         """获取 Issue 的最新进度"""
@@ -66,7 +113,7 @@ class TaskMonitor:
         with open(self.progress_log, 'r', encoding='utf-8') as f:
             for line in f:
                 try:
-                    entry = json.loads(line.strip())
+                    entry = json_codec.loads(line.strip())
                     if entry.get("issue_id") == issue_id:
                         latest = entry
                 except json.JSONDecodeError:
@@ -74,8 +121,11 @@ class TaskMonitor:
         
         return latest
     
-    def check(self, timeout_hours=24, notify=False):
-        """检查任务状态，识别超时或停滞的任务"""
+    def check(self, timeout_hours=24, notify=False, notify_options=None):
+        """检查任务状态，识别超时或停滞的任务
+        
+        notify_options: 传给 send_notifications 的 workers / timeout / retries / deadline
+        """
         index = self.load_index()
         now = datetime.now()
         
@@ -173,14 +223,23 @@ class TaskMonitor:
             print("-" * 80)
         
         if notify:
-            self.send_notifications(alerts)
+            self.send_notifications(alerts, **(notify_options or {}))
         
         return alerts
     
-    def send_notifications(self, alerts):
-        """发送飞书通知给相关负责人"""
+    def send_notifications(self, alerts, workers=NOTIFY_WORKERS, timeout=NOTIFY_TIMEOUT, retries=NOTIFY_RETRIES,
+                           deadline=NOTIFY_DEADLINE):
+        """发送飞书通知给相关负责人
+        
+        各负责人的通知在有界线程池中并发发送，每次调用最多等待 timeout 秒，
+        失败或超时后按指数退避重试 retries 次；命令不存在等无法恢复的错误不重试。
+        整轮最多 deadline 秒：单次调用的超时截到剩余时间，来不及的重试不再进行，
+        到时仍未完成的通知记为失败，不再等待。
+        返回 {"sent": [负责人], "failed": [{"assignee", "error", "attempts"}]}
+        """
+        summary = {"sent": [], "failed": []}
         if not alerts:
-            return
+            return summary
         
         print("\n📢 发送通知中...")
         
@@ -191,33 +250,76 @@ class TaskMonitor:
             if assignee not in by_assignee:
                 by_assignee[assignee] = []
             by_assignee[assignee].append(alert)
+        by_assignee.pop("unassigned", None)
+        if not by_assignee:
+            return summary
         
-        # 为每个负责人发送通知
-        for assignee, assignee_alerts in by_assignee.items():
-            if assignee == "unassigned":
-                continue
-            
+        started = time.perf_counter()
+        expires = time.monotonic() + deadline
+        lock = threading.Lock()
+        attempts_by = {assignee: 0 for assignee in by_assignee}
+        
+        def deliver(assignee, assignee_alerts):
             message = self._format_notification(assignee, assignee_alerts)
-            
-            try:
-                # 使用 sessions_send 发送消息
-                import subprocess
-                result = subprocess.run(
-                    ["openclaw", "sessions", "send", "--label", assignee, "--message", message],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    print(f"  ✅ 已通知 {assignee} ({len(assignee_alerts)} 个任务)")
+            error = "超过总时限"
+            while True:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    return error, attempts_by[assignee]
+                attempts_by[assignee] += 1
+                attempt_timeout = min(timeout, remaining)
+                try:
+                    self.transport(assignee, message, attempt_timeout)
+                    return None, attempts_by[assignee]
+                except subprocess.TimeoutExpired:
+                    error = f"超时 {attempt_timeout:.3g}s"
+                except NotificationError as e:
+                    error = str(e)
+                except Exception as e:
+                    # 命令不存在、参数错误等，重试也不会成功
+                    return f"出错: {e}", attempts_by[assignee]
+                if attempts_by[assignee] > retries:
+                    return error, attempts_by[assignee]
+                delay = NOTIFY_BACKOFF * 2 ** (attempts_by[assignee] - 1)
+                if time.monotonic() + delay >= expires:
+                    return f"{error}，超过总时限不再重试", attempts_by[assignee]
+                with lock:
+                    print(f"  ↻ 通知 {assignee} 失败（{error}），{delay:g}s 后重试")
+                time.sleep(delay)
+        
+        def record(assignee, count, error, attempts):
+            retried = f"，重试 {attempts - 1} 次" if attempts > 1 else ""
+            with lock:
+                if error is None:
+                    summary["sent"].append(assignee)
+                    print(f"  ✅ 已通知 {assignee} ({count} 个任务{retried})")
                 else:
-                    print(f"  ⚠️ 通知 {assignee} 失败: {result.stderr.strip()}")
-            
-            except subprocess.TimeoutExpired:
-                print(f"  ⚠️ 通知 {assignee} 超时")
-            except Exception as e:
-                print(f"  ⚠️ 通知 {assignee} 出错: {e}")
+                    summary["failed"].append({"assignee": assignee, "error": error, "attempts": attempts})
+                    print(f"  ⚠️ 通知 {assignee} 失败: {error}（共尝试 {attempts} 次）")
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(by_assignee))))
+        futures = {executor.submit(deliver, assignee, assignee_alerts): (assignee, len(assignee_alerts))
+                   for assignee, assignee_alerts in by_assignee.items()}
+        pending = set(futures)
+        try:
+            # 单次调用已截到剩余时间，这里多留 1 秒给子进程退出
+            for future in as_completed(futures, timeout=max(0, expires - time.monotonic()) + 1):
+                pending.discard(future)
+                assignee, count = futures[future]
+                record(assignee, count, *future.result())
+        except FuturesTimeout:
+            for future in pending:
+                assignee, count = futures[future]
+                record(assignee, count, "超过总时限", attempts_by[assignee])
+        finally:
+            # 不等待仍卡住的调用：排队的直接取消，线程结束后自行退出
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        elapsed = time.perf_counter() - started
+        print(f"\n📢 通知完成: 成功 {len(summary['sent'])}，失败 {len(summary['failed'])}，用时 {elapsed:.1f}s")
+        if summary["failed"]:
+            print(f"   失败: {', '.join(item['assignee'] for item in summary['failed'])}")
+        return summary
     
     def _format_notification(self, assignee, alerts):
         """格式化通知消息"""
@@ -294,7 +396,7 @@ class TaskMonitor:
             with open(self.progress_log, 'r', encoding='utf-8') as f:
                 for line in f:
                     try:
-                        entry = json.loads(line.strip())
+                        entry = json_codec.loads(line.strip())
                         if entry.get("issue_id") == issue_id:
                             progress_entries.append(entry)
                     except json.JSONDecodeError:
@@ -328,6 +430,11 @@ def main():
     check_parser = subparsers.add_parser("check", help="检查任务状态")
     check_parser.add_argument("--timeout-hours", type=float, default=24, help="超时阈值（小时）")
     check_parser.add_argument("--notify", action="store_true", help="发送通知")
+    check_parser.add_argument("--notify-workers", type=int, default=NOTIFY_WORKERS, help=f"同时发送的通知数（默认 {NOTIFY_WORKERS}）")
+    check_parser.add_argument("--notify-timeout", type=float, default=NOTIFY_TIMEOUT, help=f"单次通知超时秒数（默认 {NOTIFY_TIMEOUT}）")
+    check_parser.add_argument("--notify-retries", type=int, default=NOTIFY_RETRIES, help=f"失败后重试次数（默认 {NOTIFY_RETRIES}）")
+    check_parser.add_argument("--notify-deadline", type=float, default=NOTIFY_DEADLINE,
+                              help=f"整轮通知的总时限秒数，应小于调度间隔（默认 {NOTIFY_DEADLINE}）")
     
     # status 命令
     status_parser = subparsers.add_parser("status", help="查看任务状态")
@@ -344,7 +451,13 @@ def main():
     if args.command == "check":
         monitor.check(
             timeout_hours=args.timeout_hours,
-            notify=args.notify
+            notify=args.notify,
+            notify_options={
+                "workers": args.notify_workers,
+                "timeout": args.notify_timeout,
+                "retries": args.notify_retries,
+                "deadline": args.notify_deadline,
+            }
         )
     
     elif args.command == "status":
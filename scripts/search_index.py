@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+静态看板的预构建搜索索引
+由 web-dashboard/generate_static_data.py 生成 data/search.json，看板首次搜索时懒加载，
+在浏览器本地完成查询，不需要下载正文。
+
+分词（与 index.html 中的 tokenize 保持一致）:
+- 转小写后取连续的 [a-z0-9] 串，丢弃单个字母（数字保留，便于按编号搜索）
+- 连续的 CJK 字符切成二元组（bigram）；只有一个字时保留单字
+- 查询时对每个词做前缀扩展，因此单字、不完整的英文词也能命中；CJK 单字还会匹配以它结尾的二元组
+  （如“码”命中“乱码”“代码”）
+
+格式:
+  {
+    "version": 1,
+    "docs": [按 id 升序的 Issue id],
+    "terms": {词: 倒排列表}
+  }
+倒排列表按 docs 下标升序，每项编码为 (下标差值 << 3) | 字段掩码，
+字段掩码: 1 = 标题, 2 = 标签, 4 = 正文；第一项的差值相对下标 0。
+"""
+
+import re
+
+INDEX_VERSION = 1
+
+FIELD_TITLE = 1
+FIELD_LABELS = 2
+FIELD_BODY = 4
+FIELD_BITS = 3
+
+# 假名、CJK 统一表意文字（含扩展 A）、兼容表意文字、韩文音节
+CJK_CHARS = "\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_RE = re.compile(f"[a-z0-9]+|[{CJK_CHARS}]+")
+CJK_RE = re.compile(f"[{CJK_CHARS}]")
+
+
+def tokenize(text) -> list:
+    """把文本切成索引词（可能重复）"""
+    if not text:
+        return []
+    tokens = []
+    for run in TOKEN_RE.findall(str(text).lower()):
+        if CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) >= 2 or run.isdigit():
+            tokens.append(run)
+    return tokens
+
+
+def label_text(labels) -> str:
+    """labels 可能是列表或逗号分隔的字符串"""
+    if isinstance(labels, list):
+        return " ".join(str(label) for label in labels)
+    return labels or ""
+
+
+def build_search_index(issues) -> dict:
+    """从 Issue 列表（需要 id / title / labels / body）构建索引"""
+    docs = sorted({issue["id"] for issue in issues})
+    position = {issue_id: i for i, issue_id in enumerate(docs)}
+    postings = {}
+    for issue in issues:
+        doc = position[issue["id"]]
+        for field, text in (
+            (FIELD_TITLE, issue.get("title")),
+            (FIELD_LABELS, label_text(issue.get("labels"))),
+            (FIELD_BODY, issue.get("body")),
+        ):
+            for token in set(tokenize(text)):
+                masks = postings.setdefault(token, {})
+                masks[doc] = masks.get(doc, 0) | field
+
+    terms = {}
+    for token in sorted(postings):
+        encoded = []
+        previous = 0
+        for doc, mask in sorted(postings[token].items()):
+            encoded.append(((doc - previous) << FIELD_BITS) | mask)
+            previous = doc
+        terms[token] = encoded
+    return {"version": INDEX_VERSION, "docs": docs, "terms": terms}
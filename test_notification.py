@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""测试通知功能"""
+"""测试通知功能
+
+不想真的发消息时用本地桩命令代替 openclaw:
+  ISSUE_NOTIFY_COMMAND='echo {assignee}' python3 test_notification.py
+"""
 import sys
 sys.path.insert(0, 'scripts')
 from monitor import TaskMonitor
@@ -4,80 +4,104 @@ Async Issue Manager - Web Dashboard API
 轻量级 Flask API，读取 Issue 数据并提供 REST 接口
 """
 
-import json
+import hashlib
 import os
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Tuple
 
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+# 共享模块位于 scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import json_codec
+from issue_store import IssueStore
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify / request.get_json 都走 json_codec（orjson/msgspec 可用时使用，否则标准库）"""
+
+    def dumps(self, obj, **kwargs):
+        return json_codec.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # 允许跨域请求
 
 # 配置路径
-BASE_DIR = Path(__file__).parent.parent
+# ISSUE_MANAGER_ROOT 可指向其他工作区（如压测用的合成数据），默认为仓库根目录
+BASE_DIR = Path(os.environ.get("ISSUE_MANAGER_ROOT") or Path(__file__).parent.parent)
 ISSUES_DIR = BASE_DIR / ".issues"
 INDEX_FILE = ISSUES_DIR / "index.json"
 PROGRESS_FILE = ISSUES_DIR / "progress.jsonl"
+DELIVERABLES_FILE = ISSUES_DIR / "deliverables" / "index.json"
+
+
+# 共享的缓存数据访问层（scripts/issue_store.py）
+store = IssueStore(ISSUES_DIR)
 
 
 def load_index() -> Dict:
-    """加载 Issue 索引"""
-    if not INDEX_FILE.exists():
-        return {"next_id": 1, "issues": []}
-    
-    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """加载 Issue 索引（缓存，文件变化后重新加载；返回值勿修改）"""
+    return store.index()
 
 
-def load_issue_content(file_path: str) -> Optional[Dict]:
-    """加载 Issue 文件内容（Markdown + YAML frontmatter）"""
-    full_path = BASE_DIR / file_path
-    if not full_path.exists():
-        return None
-    
-    with open(full_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 解析 YAML frontmatter 和 Markdown body
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            # frontmatter = parts[1]  # 已经在 index.json 中有了
-            body = parts[2].strip()
-            return {"body": body}
-    
-    return {"body": content}
+def load_issue_body(issue: Dict) -> Dict:
+    """读取 Markdown 正文写入 issue['body']（issue 为 store 返回的副本）"""
+    loaded = store.issue_content(issue)
+    if loaded:
+        issue['body'] = loaded[1]
+    return issue
 
 
-def load_progress() -> List[Dict]:
-    """加载进度日志"""
-    if not PROGRESS_FILE.exists():
-        return []
-    
-    progress_list = []
-    with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    progress_list.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
+def cache_validators(tag: str, *paths: Path) -> Tuple[str, datetime]:
+    """根据底层文件版本（inode、大小、mtime）生成强 ETag 和 Last-Modified
     
-    return progress_list
+    tag 区分同一组文件派生出的不同响应，查询参数也应包含在内
+    """
+    versions = []
+    latest = 0.0
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            versions.append((str(path), 0, 0, 0))
+            continue
+        versions.append((str(path), st.st_ino, st.st_size, st.st_mtime_ns))
+        latest = max(latest, st.st_mtime)
+    etag = hashlib.sha1(repr((tag, versions)).encode('utf-8')).hexdigest()[:20]
+    last_modified = datetime.fromtimestamp(int(latest), tz=timezone.utc)
+    return etag, last_modified
 
 
-def load_deliverables() -> Dict:
-    """加载交付物索引"""
-    deliverables_index = ISSUES_DIR / "deliverables" / "index.json"
-    if not deliverables_index.exists():
-        return {}
-    
-    with open(deliverables_index, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def is_not_modified(etag: str, last_modified: datetime) -> bool:
+    """判断条件请求是否命中（优先 If-None-Match）"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(response, etag: str, last_modified: datetime):
+    """给响应附加缓存校验头"""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified_response(etag: str, last_modified: datetime):
+    """304 响应（不做任何序列化）"""
+    return conditional(app.response_class(status=304), etag, last_modified)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -99,6 +123,10 @@ def get_issues():
     - assignee: 按负责人过滤
     - labels: 按标签过滤（逗号分隔）
     """
+    etag, last_modified = cache_validators(f"issues?{request.query_string.decode()}", INDEX_FILE)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
     index = load_index()
     issues = index.get("issues", [])
     
@@ -121,41 +149,112 @@ def get_issues():
         label_list = [l.strip() for l in labels.split(',')]
         issues = [i for i in issues if any(l in i.get('labels', []) for l in label_list)]
     
-    return jsonify({
+    return conditional(jsonify({
         "total": len(issues),
         "issues": issues
-    })
+    }), etag, last_modified)
+
+
+BATCH_MAX_IDS = 200
+
+
+def parse_flag(name: str, default: bool = True) -> bool:
+    """解析布尔查询参数（0/false/no 视为关闭）"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+@app.route('/api/issues:batch', methods=['GET'])
+def get_issues_batch():
+    """批量获取 Issue 详情
+    
+    Query Parameters:
+    - ids: 逗号分隔的 Issue ID（必填，最多 200 个）
+    - body / progress / deliverables: 是否包含对应内容（默认 true）
+    
+    返回以 ID 为键的映射，不存在的 ID 列在 missing 中
+    """
+    requested = []
+    for part in request.args.get('ids', '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            return jsonify({"error": f"Invalid issue id: {part}"}), 400
+        if int(part) not in requested:
+            requested.append(int(part))
+    if not requested:
+        return jsonify({"error": "ids is required"}), 400
+    if len(requested) > BATCH_MAX_IDS:
+        return jsonify({"error": f"At most {BATCH_MAX_IDS} ids per request"}), 400
+    
+    include_body = parse_flag('body')
+    include_progress = parse_flag('progress')
+    include_deliverables = parse_flag('deliverables')
+    
+    found = store.get_issues(requested)
+    issues = [found[issue_id] for issue_id in requested if issue_id in found]
+    missing = [issue_id for issue_id in requested if issue_id not in found]
+    
+    sources = [INDEX_FILE]
+    if include_progress:
+        sources.append(PROGRESS_FILE)
+    if include_deliverables:
+        sources.append(DELIVERABLES_FILE)
+    if include_body:
+        sources.extend(path for path in map(store.issue_path, issues) if path)
+    etag, last_modified = cache_validators(
+        f"issues-batch?{','.join(map(str, requested))}&{include_body}{include_progress}{include_deliverables}",
+        *sources
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    # 进度和交付物按 Issue ID 索引，各取一次
+    progress_by_issue = store.progress_batch(found) if include_progress else {}
+    deliverables_by_issue = store.deliverables_batch(found) if include_deliverables else {}
+    
+    details = {}
+    for issue in issues:
+        issue_id = issue['id']
+        if include_body:
+            load_issue_body(issue)
+        if include_progress:
+            issue['progress_history'] = progress_by_issue[issue_id]
+        if include_deliverables:
+            issue['deliverables'] = deliverables_by_issue[issue_id]
+        details[str(issue_id)] = issue
+    
+    return conditional(jsonify({
+        "total": len(details),
+        "issues": details,
+        "missing": missing
+    }), etag, last_modified)
 
 
 @app.route('/api/issues/<int:issue_id>', methods=['GET'])
 def get_issue(issue_id: int):
     """获取单个 Issue 详情"""
-    index = load_index()
-    issues = index.get("issues", [])
-    
-    # 查找 Issue
-    issue = next((i for i in issues if i.get('id') == issue_id), None)
+    issue = store.get_issue(issue_id)
     if not issue:
         return jsonify({"error": "Issue not found"}), 404
     
-    # 加载完整内容
-    file_path = issue.get('file')
+    sources = [INDEX_FILE, PROGRESS_FILE, DELIVERABLES_FILE]
+    file_path = store.issue_path(issue)
     if file_path:
-        content = load_issue_content(file_path)
-        if content:
-            issue['body'] = content.get('body', '')
+        sources.append(file_path)
+    etag, last_modified = cache_validators(f"issue-{issue_id}", *sources)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
     
-    # 加载进度记录
-    all_progress = load_progress()
-    issue_progress = [p for p in all_progress if p.get('issue_id') == issue_id]
-    issue['progress_history'] = issue_progress
+    # 加载完整内容、进度记录和交付物
+    load_issue_body(issue)
+    issue['progress_history'] = store.progress(issue_id)
+    issue['deliverables'] = store.deliverables(issue_id)
     
-    # 加载交付物
-    deliverables = load_deliverables()
-    issue_key = f"issue-{issue_id:03d}"
-    issue['deliverables'] = deliverables.get(issue_key, [])
-    
-    return jsonify(issue)
+    return conditional(jsonify(issue), etag, last_modified)
 
 
 @app.route('/api/progress', methods=['GET'])
@@ -167,7 +266,9 @@ def get_progress():
     - agent: 按 Agent 过滤
     - limit: 限制返回数量（默认 100）
     """
-    all_progress = load_progress()
+    etag, last_modified = cache_validators(f"progress?{request.query_string.decode()}", PROGRESS_FILE)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
     
     # 过滤
     issue_id = request.args.get('issue_id', type=int)
@@ -175,7 +276,9 @@ def get_progress():
     limit = request.args.get('limit', type=int, default=100)
     
     if issue_id:
-        all_progress = [p for p in all_progress if p.get('issue_id') == issue_id]
+        all_progress = store.progress(issue_id)
+    else:
+        all_progress = store.all_progress()
     
     if agent:
         all_progress = [p for p in all_progress if p.get('agent') == agent]
@@ -186,15 +289,19 @@ def get_progress():
     # 限制数量
     all_progress = all_progress[:limit]
     
-    return jsonify({
+    return conditional(jsonify({
         "total": len(all_progress),
         "progress": all_progress
-    })
+    }), etag, last_modified)
 
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """获取统计信息"""
+    etag, last_modified = cache_validators("stats", INDEX_FILE)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
     index = load_index()
     issues = index.get("issues", [])
     
@@ -223,18 +330,22 @@ def get_stats():
         for label in issue.get('labels', []):
             label_counts[label] = label_counts.get(label, 0) + 1
     
-    return jsonify({
+    return conditional(jsonify({
         "total": len(issues),
         "by_status": status_counts,
         "by_priority": priority_counts,
         "by_assignee": assignee_counts,
         "by_label": label_counts
-    })
+    }), etag, last_modified)
 
 
 @app.route('/api/agents', methods=['GET'])
 def get_agents():
     """获取所有 Agent 列表及其任务统计"""
+    etag, last_modified = cache_validators("agents", INDEX_FILE)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
     index = load_index()
     issues = index.get("issues", [])
     
@@ -262,10 +373,10 @@ def get_agents():
         elif status == 'closed':
             agents[assignee]["closed"] += 1
     
-    return jsonify({
+    return conditional(jsonify({
         "total": len(agents),
         "agents": list(agents.values())
-    })
+    }), etag, last_modified)
 
 
 if __name__ == '__main__':
@@ -1,23 +1,87 @@
 #!/usr/bin/env python3
 """
 生成静态 JSON 数据文件，用于 Cloudflare Pages 部署
+
+增量生成：
+- data/.manifest.json 记录各源文件和输出文件的内容哈希（随数据一起提交）
+- .cache/static_parse.json 按 (大小, mtime, sha1) 缓存 Markdown 解析结果（本地，不提交）
+- 没有解析缓存时（如 CI 的全新 checkout），内容 sha1 与清单 sources 一致的 Markdown
+  直接复用已提交的 issues/<id>.json，不重新解析
+- 只重新解析内容变化的 Issue；输出内容（忽略 generated_at）不变的文件不重写，
+  保持原有字节和 mtime，update_and_push.sh 的 git diff --quiet 才有意义
+
+分页列表：看板首屏只下载 index.json（分页清单）和最新一页精简记录（list/page-NNNN.json），
+完整的正文、进度和交付物只在 issues/<id>.json 中。旧版全量 issues.json 在弃用期内仍然生成，
+看板不再读取它。分页按 id 区间划分（每页 LIST_PAGE_SIZE 个 id），
+新建 Issue 只影响最后一页，修改某个 Issue 只影响它所在的一页。
+
+增量更新：内容有变化时 generation 加 1，并写出 changes/<generation>.json，
+列出相对上一代新增、修改（详情文件内容变化）和删除的 Issue id 及新的精简记录；
+看板记住上次看到的 generation，刷新时只拉取之后的增量文件。最多保留 CHANGES_KEEP 代。
+部署构建不提交清单，generation 可能重复，因此 index.json 和增量文件还带有整份数据的内容哈希
+（content / previous_content），看板比较哈希，接不上时全量重新加载。
+
+搜索索引：search.json 是标题、标签和正文的倒排索引（格式见 scripts/search_index.py），
+看板首次搜索时按 index.json 中的哈希懒加载，在本地完成查询。
+
+部署构建（--minify）：输出紧凑 JSON，结束时报告 pretty / 实际输出的总大小。
+清单记录输出格式，格式切换时全部重写。传输压缩由 Cloudflare Pages 在边缘完成，不生成预压缩文件。
+
+并行解析：--jobs N 把需要重新解析的 Markdown 分块交给进程池，结果按 (id, 文件路径)
+排序合并，与单进程输出逐字节一致。待解析文件很少时（如增量运行）直接在本进程解析。
+
+用法:
+  python3 generate_static_data.py            # 增量生成
+  python3 generate_static_data.py --full     # 忽略缓存和清单，全部重新生成
+  python3 generate_static_data.py --jobs 0   # 按 CPU 核数并行解析（CI 冷启动时）
+  python3 generate_static_data.py --minify # 部署构建
 """
 
-import json
+import argparse
+import hashlib
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
-# 项目根目录
-ROOT_DIR = Path(__file__).parent.parent
+# 共享模块位于 scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import json_codec
+from issue_store import IssueStore
+from search_index import build_search_index
+
+# 项目根目录；ISSUE_MANAGER_ROOT 可指向其他工作区（如基准测试用的合成数据）
+ROOT_DIR = Path(os.environ.get('ISSUE_MANAGER_ROOT') or Path(__file__).parent.parent)
 ISSUES_DIR = ROOT_DIR / ".issues"
 OUTPUT_DIR = Path(__file__).parent / "data"
+MANIFEST_FILE = OUTPUT_DIR / ".manifest.json"
+PARSE_CACHE_FILE = ROOT_DIR / ".cache" / "static_parse.json"
 
-def parse_issue_file(file_path):
-    """解析 Issue Markdown 文件"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+# 只表示生成时间、不代表内容变化的字段
+VOLATILE_FIELDS = ('generated_at',)
+
+# 保留的增量文件数量（每小时部署时约一周）
+CHANGES_KEEP = 168
+
+# 列表分页：每页覆盖的 id 区间大小，以及精简记录保留的字段（卡片和筛选用到的字段）
+LIST_PAGE_SIZE = 250
+LIST_FIELDS = ('id', 'title', 'status', 'priority', 'assignee', 'labels', 'created_at', 'updated_at')
+
+# 待解析文件少于此数时不启动进程池（进程启动和结果回传的开销更大）
+PARALLEL_MIN_FILES = 200
+# 每个任务块的最大文件数；块太大时负载不均，太小时 IPC 开销占比高
+PARSE_CHUNK_SIZE = 500
+
+store = IssueStore(ISSUES_DIR)
+
+def parse_issue_file(file_path, content=None):
+    """解析 Issue Markdown 文件（content 为已读取的文件内容）"""
+    if content is None:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
     
     # 提取 frontmatter
     if not content.startswith('---'):
@@ -138,9 +202,54 @@ def parse_issue_file(file_path):
     
     return result
 
-def collect_all_issues():
-    """收集所有 Issue"""
-    issues = []
+def sha1_bytes(data):
+    return hashlib.sha1(data).hexdigest()
+
+def parse_chunk(tasks):
+    """读取、哈希并解析一组文件（进程池任务，也用于单进程路径）
+    
+    tasks: [(相对路径, 缓存中的 sha1 或 None)]
+    返回 [(相对路径, size, mtime_ns, sha1, issue, 是否重新解析)]；
+    内容与缓存 sha1 相同时不解析，issue 为 None，由调用方取缓存
+    """
+    results = []
+    for rel, cached_sha1 in tasks:
+        file_path = ROOT_DIR / rel
+        st = file_path.stat()
+        data = file_path.read_bytes()
+        digest = sha1_bytes(data)
+        if digest == cached_sha1:
+            # 只是 mtime 变了（如重新 checkout），内容相同
+            results.append((rel, st.st_size, st.st_mtime_ns, digest, None, False))
+        else:
+            issue = parse_issue_file(file_path, data.decode('utf-8'))
+            results.append((rel, st.st_size, st.st_mtime_ns, digest, issue, True))
+    return results
+
+def split_chunks(items, jobs):
+    """切分任务块：每个进程至少分到约 4 块以平衡负载，单块不超过 PARSE_CHUNK_SIZE"""
+    size = max(1, min(PARSE_CHUNK_SIZE, -(-len(items) // (jobs * 4))))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def resolve_jobs(jobs):
+    """--jobs 0 表示使用全部 CPU 核"""
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+def collect_all_issues(parse_cache=None, source_hashes=None, counters=None, jobs=1):
+    """收集所有 Issue
+    
+    parse_cache: {相对路径: {size, mtime_ns, sha1, issue}}，命中时跳过读取/解析，并就地更新
+    source_hashes: 传入 dict 时写入 {相对路径: sha1}
+    counters: 传入 dict 时累计 parsed / cached 数量
+    jobs: 并行解析的进程数（0 为 CPU 核数）；结果与 jobs=1 完全一致
+    """
+    parse_cache = parse_cache if parse_cache is not None else {}
+    source_hashes = source_hashes if source_hashes is not None else {}
+    counters = counters if counters is not None else {}
+    counters.setdefault('parsed', 0)
+    counters.setdefault('cached', 0)
+    entries = {}
+    pending = []
     
     for status_dir in ['open', 'in-progress', 'closed']:
         status_path = ISSUES_DIR / status_dir
@@ -148,11 +257,50 @@ def collect_all_issues():
             continue
         
         for file_path in status_path.glob('*.md'):
-            issue = parse_issue_file(file_path)
-            if issue:
-                issues.append(issue)
-    
-    return sorted(issues, key=lambda x: x['id'])
+            rel = str(file_path.relative_to(ROOT_DIR))
+            st = file_path.stat()
+            cached = parse_cache.get(rel)
+            
+            # 大小和 mtime 都没变：直接使用缓存，连文件都不读
+            if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+                entries[rel] = cached
+                counters['cached'] += 1
+            else:
+                pending.append((rel, cached['sha1'] if cached else None))
+    
+    jobs = resolve_jobs(jobs)
+    if jobs > 1 and len(pending) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunks = list(executor.map(parse_chunk, split_chunks(pending, jobs)))
+    else:
+        chunks = [parse_chunk(pending)]
+    
+    for results in chunks:
+        for rel, size, mtime_ns, digest, issue, parsed in results:
+            if parsed:
+                counters['parsed'] += 1
+            else:
+                issue = parse_cache[rel]['issue']
+                counters['cached'] += 1
+            entries[rel] = {
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'sha1': digest,
+                'issue': issue
+            }
+    
+    # 按路径重建缓存：内容与目录遍历和任务完成顺序无关，已删除的文件随之清除
+    parse_cache.clear()
+    issues = []
+    for rel in sorted(entries):
+        entry = parse_cache[rel] = entries[rel]
+        source_hashes[rel] = entry['sha1']
+        if entry['issue']:
+            # 返回副本，后续合并进度和交付物不影响缓存
+            issues.append(dict(entry['issue']))
+    
+    # 同一 id 出现在多个文件中时按路径排序，保证合并结果确定
+    return sorted(issues, key=lambda x: (x['id'], x['file']))
 
 def generate_stats(issues):
     """生成统计信息"""
@@ -213,64 +361,226 @@ def generate_agents_info(issues):
         'agents': sorted(agents.values(), key=lambda x: x['total'], reverse=True)
     }
 
+def slim_issue(issue):
+    """列表用的精简记录"""
+    return {field: issue.get(field) for field in LIST_FIELDS}
+
+def build_list_pages(issues):
+    """按 id 区间把 Issue 切成精简记录分页，返回 [(页号, 记录列表)]，页号和页内记录都从新到旧"""
+    pages = defaultdict(list)
+    for issue in issues:
+        page_no = max(0, issue['id'] - 1) // LIST_PAGE_SIZE
+        pages[page_no].append(slim_issue(issue))
+    return [
+        (page_no, sorted(pages[page_no], key=lambda x: x['id'], reverse=True))
+        for page_no in sorted(pages, reverse=True)
+    ]
+
+def detail_digests(outputs):
+    """{issue id: 详情文件内容哈希}"""
+    digests = {}
+    for rel, digest in outputs.items():
+        if rel.startswith('issues/') and rel.endswith('.json'):
+            try:
+                digests[int(rel[len('issues/'):-len('.json')])] = digest
+            except ValueError:
+                continue
+    return digests
+
+def build_changes(previous_outputs, current_outputs, issues):
+    """对比两代详情文件哈希，返回新增 / 修改 / 删除的 Issue"""
+    before = detail_digests(previous_outputs)
+    after = detail_digests(current_outputs)
+    by_id = {issue['id']: issue for issue in issues}
+    return {
+        'added': [slim_issue(by_id[i]) for i in sorted(after.keys() - before.keys())],
+        'changed': [slim_issue(by_id[i]) for i in sorted(after.keys() & before.keys()) if after[i] != before[i]],
+        'removed': sorted(before.keys() - after.keys())
+    }
+
+def change_generations():
+    """已有增量文件的 generation（升序）"""
+    generations = []
+    for path in (OUTPUT_DIR / 'changes').glob('*.json'):
+        if path.stem.isdigit():
+            generations.append(int(path.stem))
+    return sorted(generations)
+
+def merged_fields(issue_id, progress_by_issue, deliverables_by_issue):
+    """详情中被 progress.jsonl / deliverables/index.json 覆盖的字段"""
+    fields = []
+    if issue_id in progress_by_issue:
+        fields.append('progress_history')
+    if issue_id in deliverables_by_issue:
+        fields.append('deliverables')
+    return fields
+
+def seed_parse_cache(parse_cache, sources, progress_by_issue, deliverables_by_issue):
+    """用清单 sources 和已提交的详情文件补齐解析缓存，返回 {补齐的相对路径: sha1}
+    
+    补齐的条目 size / mtime 为 -1，collect_all_issues 会读取并哈希文件，sha1 一致时直接使用详情内容。
+    详情是解析结果合并进度和交付物之后的内容：这次仍会被覆盖的字段无关紧要；
+    上次被覆盖、这次不再覆盖的字段无法还原，这类文件以及同一 id 对应多个文件的情况仍重新解析。
+    """
+    ids = defaultdict(int)
+    for info in sources.values():
+        if isinstance(info, dict) and 'id' in info:
+            ids[info['id']] += 1
+    seeded = {}
+    for rel, info in sources.items():
+        if rel in parse_cache or not isinstance(info, dict) or ids.get(info.get('id')) != 1:
+            continue
+        issue_id = info['id']
+        now_merged = merged_fields(issue_id, progress_by_issue, deliverables_by_issue)
+        if any(field not in now_merged for field in info.get('merged', [])):
+            continue
+        issue = load_json(OUTPUT_DIR / 'issues' / f'{issue_id}.json', None)
+        if not isinstance(issue, dict) or issue.get('file') != rel:
+            continue
+        parse_cache[rel] = {'size': -1, 'mtime_ns': -1, 'sha1': info['sha1'], 'issue': issue}
+        seeded[rel] = info['sha1']
+    return seeded
+
 def load_progress_history():
     """从 progress.jsonl 加载进度记录"""
-    progress_file = ISSUES_DIR / 'progress.jsonl'
     progress_by_issue = defaultdict(list)
-    
-    if progress_file.exists():
-        with open(progress_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    record = json.loads(line)
-                    issue_id = record.get('issue_id')
-                    if issue_id:
-                        progress_by_issue[issue_id].append({
-                            'timestamp': record.get('timestamp', ''),
-                            'agent': record.get('agent', ''),
-                            'progress': record.get('progress', '')
-                        })
-                except json.JSONDecodeError:
-                    continue
-    
+    for record in store.all_progress():
+        issue_id = record.get('issue_id')
+        if issue_id:
+            progress_by_issue[issue_id].append({
+                'timestamp': record.get('timestamp', ''),
+                'agent': record.get('agent', ''),
+                'progress': record.get('progress', '')
+            })
     return progress_by_issue
 
 def load_deliverables():
     """从 deliverables/index.json 加载交付物"""
-    deliverables_file = ISSUES_DIR / 'deliverables' / 'index.json'
     deliverables_by_issue = defaultdict(list)
-    
-    if deliverables_file.exists():
-        with open(deliverables_file, 'r', encoding='utf-8') as f:
-            try:
-                data = json.load(f)
-                for item in data.get('deliverables', []):
-                    issue_id = item.get('issue_id')
-                    if issue_id:
-                        deliverables_by_issue[issue_id].append({
-                            'file': item.get('file', ''),
-                            'description': item.get('description', ''),
-                            'added_at': item.get('added_at', '')
-                        })
-            except json.JSONDecodeError:
-                pass
-    
+    for item in store.all_deliverables():
+        issue_id = item.get('issue_id')
+        if issue_id:
+            deliverables_by_issue[issue_id].append({
+                # deliverable.py 记录的是 path / filename
+                'file': item.get('file') or item.get('path', ''),
+                'description': item.get('description', ''),
+                'added_at': item.get('added_at', '')
+            })
     return deliverables_by_issue
 
+def format_size(size):
+    """字节数转为可读大小"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def load_json(path, default):
+    """读取 JSON 文件，不存在或损坏时返回 default"""
+    try:
+        return json_codec.load_file(path)
+    except (OSError, ValueError):
+        return default
+
+def canonical_bytes(obj):
+    """用于比较内容的规范输出（忽略 generated_at 等只表示生成时间的字段）
+    
+    使用 pretty 输出：各 JSON 后端的 pretty 输出逐字节一致，换后端不会导致全部重写
+    """
+    if isinstance(obj, dict):
+        obj = {k: v for k, v in obj.items() if k not in VOLATILE_FIELDS}
+    return json_codec.dumps_bytes(obj, pretty=True)
+
+def content_digest(obj):
+    """输出内容哈希，与输出格式（pretty / minify）无关"""
+    return sha1_bytes(canonical_bytes(obj))
+
+def outputs_digest(outputs):
+    """整份数据的内容哈希（不含 index.json 和增量文件），与 generation 一起标识数据版本
+    
+    部署构建不会把清单提交回仓库，不同的构建可能从同一份清单出发得到相同的 generation，
+    看板要同时比较 generation 和它才能判断数据是否相同、增量能否接上
+    """
+    return content_digest({rel: digest for rel, digest in sorted(outputs.items())
+                           if rel != 'index.json' and not rel.startswith('changes/')})
+
+class OutputWriter:
+    """只重写内容变化的输出文件，并记录每个文件的内容哈希
+    
+    minify: 写紧凑 JSON
+    sizes 累计全部输出的 pretty 大小和实际落盘大小（含未变化的文件），用于报告压缩效果
+    """
+    
+    def __init__(self, previous_outputs, full=False, minify=False):
+        self.previous = {} if full else previous_outputs
+        self.full = full
+        self.minify = minify
+        self.outputs = {}
+        self.written = []
+        self.unchanged = 0
+        self.removed = []
+        self.sizes = defaultdict(int)
+    
+    def write(self, rel, obj):
+        path = OUTPUT_DIR / rel
+        canonical = canonical_bytes(obj)
+        digest = sha1_bytes(canonical)
+        self.outputs[rel] = digest
+        self.sizes['pretty'] += len(canonical)
+        changed = True
+        if not self.full and path.exists():
+            previous = self.previous.get(rel)
+            # 没有清单记录（首次增量运行）时与现有文件内容比较
+            if previous is None:
+                previous = content_digest(load_json(path, None))
+            changed = previous != digest
+        
+        if changed:
+            data = json_codec.dumps_bytes(obj, pretty=not self.minify)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self.written.append(rel)
+        else:
+            self.unchanged += 1
+        self.sizes['output'] += path.stat().st_size
+        return changed
+    
+    def remove(self, rel):
+        """删除一个输出文件"""
+        (OUTPUT_DIR / rel).unlink()
+        self.removed.append(rel)
+    
+    def remove_stale(self, directory, pattern):
+        """删除 directory 下本次没有生成的文件（如已删除 Issue 的详情）"""
+        for path in (OUTPUT_DIR / directory).glob(pattern):
+            rel = str(path.relative_to(OUTPUT_DIR))
+            if rel not in self.outputs:
+                self.remove(rel)
+    
+    def content_changed(self, previous_outputs, ignore=()):
+        """与上一代清单相比是否有内容变化（只比较哈希，与是否重写文件无关）"""
+        for rel, digest in self.outputs.items():
+            if previous_outputs.get(rel) != digest:
+                return True
+        return any(rel not in self.outputs and rel not in ignore for rel in previous_outputs)
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="生成静态 JSON 数据")
+    parser.add_argument('--full', action='store_true', help='忽略缓存和清单，全部重新解析和写入')
+    parser.add_argument('--jobs', type=int, default=1, help='并行解析的进程数（0 为 CPU 核数，默认 1）')
+    parser.add_argument('--minify', action='store_true', help='输出紧凑 JSON（部署构建用；默认 pretty，便于 git diff）')
+    args = parser.parse_args()
+    
     print("🔄 开始生成静态数据...")
     
     # 创建输出目录
     OUTPUT_DIR.mkdir(exist_ok=True)
     
-    # 收集所有 Issue
-    print("📋 收集 Issues...")
-    issues = collect_all_issues()
-    print(f"   找到 {len(issues)} 个 Issues")
+    # --full 时也读取清单：generation 需要连续，增量文件需要上一代的详情哈希
+    manifest = load_json(MANIFEST_FILE, {})
+    parse_cache = {} if args.full else load_json(PARSE_CACHE_FILE, {})
     
     # 加载进度记录和交付物
     print("📝 加载进度记录...")
@@ -279,13 +589,38 @@ def main():
     print("📦 加载交付物...")
     deliverables_by_issue = load_deliverables()
     
-    # 合并进度记录和交付物到 Issue
+    # 没有本地解析缓存的文件（如 CI 的全新 checkout）按清单 sources 复用已提交的详情
+    seeded = {}
+    if not args.full:
+        seeded = seed_parse_cache(parse_cache, manifest.get('sources', {}), progress_by_issue, deliverables_by_issue)
+    
+    # 收集所有 Issue
+    print("📋 收集 Issues...")
+    source_hashes = {}
+    counters = {}
+    issues = collect_all_issues(parse_cache, source_hashes, counters, jobs=args.jobs)
+    reused = sum(1 for rel, digest in seeded.items() if source_hashes.get(rel) == digest)
+    print(f"   找到 {len(issues)} 个 Issues（重新解析 {counters['parsed']}，复用 {counters['cached']}，"
+          f"其中按清单复用详情 {reused}）")
+    
+    sources = {rel: {'sha1': digest} for rel, digest in source_hashes.items()}
+    for source in (store.progress_file, store.deliverables_file):
+        if source.exists():
+            sources[str(source.relative_to(ROOT_DIR))] = {'sha1': sha1_bytes(source.read_bytes())}
+    
+    # 合并进度记录和交付物到 Issue；清单记下每个源文件的 id 和被覆盖的字段，供下次复用详情时判断
     for issue in issues:
         issue_id = issue['id']
         if issue_id in progress_by_issue:
             issue['progress_history'] = progress_by_issue[issue_id]
         if issue_id in deliverables_by_issue:
             issue['deliverables'] = deliverables_by_issue[issue_id]
+        source = sources.get(issue['file'])
+        if source is not None:
+            source['id'] = issue_id
+            merged = merged_fields(issue_id, progress_by_issue, deliverables_by_issue)
+            if merged:
+                source['merged'] = merged
     
     # 生成统计信息
     print("📊 生成统计信息...")
@@ -295,51 +630,129 @@ def main():
     print("👥 生成 Agent 信息...")
     agents = generate_agents_info(issues)
     
-    # 写入文件
+    # 写入文件（内容未变化的文件保持不动）
     print("💾 写入数据文件...")
-    
-    # issues.json - 所有 Issue 列表
-    with open(OUTPUT_DIR / 'issues.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'total': len(issues),
-            'issues': issues,
-            'generated_at': datetime.now().isoformat()
-        }, f, ensure_ascii=False, indent=2)
-    print(f"   ✓ issues.json ({len(issues)} issues)")
+    # 输出格式变化（pretty <-> minify）时内容哈希不变，需要强制重写
+    full = args.full or manifest.get('minify', False) != args.minify
+    writer = OutputWriter(manifest.get('outputs', {}), full=full, minify=args.minify)
+    now = datetime.now().isoformat()
+    
+    # list/page-NNNN.json - 精简列表分页
+    pages = []
+    for page_no, records in build_list_pages(issues):
+        rel = f"list/page-{page_no:04d}.json"
+        writer.write(rel, {'page': page_no, 'issues': records})
+        pages.append({
+            'file': rel,
+            'count': len(records),
+            'first_id': records[-1]['id'],
+            'last_id': records[0]['id'],
+            # 内容哈希，看板用作查询参数，页面内容不变时命中浏览器/CDN 缓存
+            'hash': writer.outputs[rel][:12]
+        })
+    writer.remove_stale('list', '*.json')
+    print(f"   ✓ list/*.json ({len(pages)} pages)")
+    
+    # search.json - 搜索索引（看板首次搜索时懒加载）
+    search = build_search_index(issues)
+    writer.write('search.json', search)
+    print(f"   ✓ search.json ({len(search['terms'])} terms)")
+    
+    # issues.json - 旧版全量列表（含正文），看板已改用分页列表；弃用期内继续生成，供外部使用方迁移
+    writer.write('issues.json', {
+        'total': len(issues),
+        'issues': issues,
+        'deprecated': 'issues.json 将在后续版本移除，请改用 index.json + list/page-NNNN.json，详情见 issues/<id>.json',
+        'generated_at': now
+    })
+    print(f"   ✓ issues.json ({len(issues)} issues，已弃用)")
     
     # stats.json - 统计信息
-    with open(OUTPUT_DIR / 'stats.json', 'w', encoding='utf-8') as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    writer.write('stats.json', stats)
     print(f"   ✓ stats.json")
     
     # agents.json - Agent 信息
-    with open(OUTPUT_DIR / 'agents.json', 'w', encoding='utf-8') as f:
-        json.dump(agents, f, ensure_ascii=False, indent=2)
+    writer.write('agents.json', agents)
     print(f"   ✓ agents.json ({agents['total']} agents)")
     
     # 为每个 Issue 生成单独的文件（可选，用于详情页）
-    issues_detail_dir = OUTPUT_DIR / 'issues'
-    issues_detail_dir.mkdir(exist_ok=True)
-    
     for issue in issues:
-        issue_file = issues_detail_dir / f"{issue['id']}.json"
-        with open(issue_file, 'w', encoding='utf-8') as f:
-            json.dump(issue, f, ensure_ascii=False, indent=2)
+        writer.write(f"issues/{issue['id']}.json", issue)
+    writer.remove_stale('issues', '*.json')
     print(f"   ✓ issues/*.json ({len(issues)} files)")
     
-    # 生成元数据
+    # 生成元数据（generated_at 只在内容变化时更新）
     metadata = {
-        'generated_at': datetime.now().isoformat(),
+        'generated_at': now,
         'total_issues': len(issues),
         'version': '1.0.0'
     }
-    with open(OUTPUT_DIR / 'metadata.json', 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    writer.write('metadata.json', metadata)
     print(f"   ✓ metadata.json")
     
+    # generation 只在内容变化时加 1（切换 pretty / minify 导致的重写不算）
+    previous_outputs = manifest.get('outputs', {})
+    generation = manifest.get('generation', 0)
+    content = outputs_digest(writer.outputs)
+    if writer.content_changed(previous_outputs, ignore=('index.json',)):
+        generation += 1
+        # changes/<generation>.json - 相对上一代的增量（没有上一代清单时无从比较）；
+        # 记下前后两代的内容哈希，看板据此确认增量接在自己手上的数据之后
+        if previous_outputs:
+            changes = build_changes(previous_outputs, writer.outputs, issues)
+            writer.write(f"changes/{generation}.json", {
+                'generation': generation,
+                'previous': generation - 1,
+                'content': content,
+                'previous_content': outputs_digest(previous_outputs),
+                **changes,
+                'generated_at': now
+            })
+            print(f"   ✓ changes/{generation}.json (新增 {len(changes['added'])}，"
+                  f"修改 {len(changes['changed'])}，删除 {len(changes['removed'])})")
+    for old in change_generations():
+        if old <= generation - CHANGES_KEEP:
+            writer.remove(f"changes/{old}.json")
+    available = change_generations()
+    
+    # index.json - 分页清单（从新到旧）、搜索索引位置和可用的增量范围
+    writer.write('index.json', {
+        'generation': generation,
+        'content': content,
+        'total': len(issues),
+        'page_size': LIST_PAGE_SIZE,
+        'fields': list(LIST_FIELDS),
+        'pages': pages,
+        'search': {'file': 'search.json', 'hash': writer.outputs['search.json'][:12]},
+        # 从 generation g 追到最新需要 changes/(g+1)..changes/<generation>，g + 1 >= oldest 时可用
+        'changes': {'oldest': available[0] if available else None},
+        'generated_at': now
+    })
+    print(f"   ✓ index.json (generation {generation}, {len(issues)} issues)")
+    
+    # 清单只在有变化时更新，保证无变更时 data/ 完全不动；增量文件不计入（只写一次）
+    new_manifest = {
+        'generation': generation,
+        'minify': args.minify,
+        'sources': dict(sorted(sources.items())),
+        'outputs': {rel: digest for rel, digest in sorted(writer.outputs.items())
+                    if not rel.startswith('changes/')}
+    }
+    if new_manifest != manifest:
+        json_codec.dump_file(new_manifest, MANIFEST_FILE, pretty=True)
+    
+    PARSE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    json_codec.dump_file(parse_cache, PARSE_CACHE_FILE)
+    
     print("\n✅ 静态数据生成完成！")
     print(f"   输出目录: {OUTPUT_DIR}")
     print(f"   总计: {len(issues)} issues, {agents['total']} agents")
+    print(f"   写入 {len(writer.written)} 个文件，未变化 {writer.unchanged} 个，删除 {len(writer.removed)} 个")
+    sizes = writer.sizes
+    report = [f"pretty {format_size(sizes['pretty'])}"]
+    if args.minify:
+        report.append(f"minify {format_size(sizes['output'])}")
+    print(f"   输出大小: {' → '.join(report)}")
 
 if __name__ == '__main__':
     main()